@@ -1,28 +1,177 @@
-import re
+import asyncio
+import hashlib
+import json
+import os
+from contextlib import asynccontextmanager
 
-from fastapi import FastAPI, File, Form, UploadFile
+from fastapi import FastAPI, File, Form, HTTPException, UploadFile
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.models import (
     AnalyzeRoleRequest,
     AnalyzeRoleResponse,
+    BatchSubmitTaskRequest,
+    BatchSubmitTaskResponse,
+    BatchSubmitTaskResult,
+    CohortAnalysisRequest,
+    CohortAnalysisResponse,
     GenerateCareerPlanRequest,
     GenerateCareerPlanResponse,
     GenerateRoadmapRequest,
     GenerateRoadmapResponse,
+    JobStatusResponse,
     MissingSkill,
     ProfileAnalysisResponse,
+    RankRolesRequest,
+    RankRolesResponse,
+    RecommendRolesRequest,
+    RecommendRolesResponse,
     SubmitTaskRequest,
     SubmitTaskResponse,
+    TaskFeedback,
+    UserMetrics,
+    WeekPlan,
 )
+from app.services import llm_client
+from app.services.cohort_engine import analyze_cohort
+from app.services.github_client import github_client
+from app.services.heuristic_scorer import heuristic_feedback, provisional_feedback
+from app.services.job_queue import job_queue
+from app.services.llm_cache import llm_cache
+from app.services.market_data import market_data
+from app.services.pdf_extractor import PdfExtractionError
 from app.services.profile_engine import analyze_profile
-from app.services.roadmap_engine import generate_roadmap
+from app.services.resume_cache import resume_cache
+from app.services.roadmap_engine import (
+    CAPSTONE_DAY,
+    DEFAULT_ROLE_CONTEXT,
+    REVIEW_DAY,
+    ROADMAP_MODEL,
+    ROADMAP_SYSTEM_PROMPT,
+    generate_roadmap,
+    iter_completed_weeks,
+    plan_roadmap,
+)
 from app.services.role_engine import analyze_role
-from app.services.eval_engine import evaluate_submission
-from app.services.utils import load_user_metrics, update_metrics_on_task_submission
+from app.services.eval_engine import (
+    EVAL_MODEL,
+    EVAL_SYSTEM_PROMPT,
+    grade_submission,
+    routing_stats,
+    stream_evaluation,
+)
+from app.services.utils import (
+    load_user_metrics,
+    load_user_roadmap,
+    reconcile_task_submission,
+    save_user_roadmap,
+    update_metrics_on_task_submission,
+    update_metrics_on_task_submissions,
+)
+
+SUBMIT_TASK_DEADLINE_SECONDS = float(os.getenv("SUBMIT_TASK_DEADLINE_SECONDS", "10"))
+OLLAMA_WARM_UP = os.getenv("OLLAMA_WARM_UP", "1") != "0"
+RESUME_MAX_BYTES = int(os.getenv("RESUME_MAX_BYTES", str(10 * 1024 * 1024)))
+UPLOAD_CHUNK_BYTES = 64 * 1024
+# Multipart boundaries, part headers and the github_username field
+PROFILE_FORM_OVERHEAD_BYTES = 64 * 1024
+
+# Strong references to fire-and-forget tasks (e.g. score reconciliation)
+_background_tasks: set[asyncio.Task] = set()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    try:
+        invalidated = await llm_client.refresh_model_digests()
+        if invalidated:
+            print(f"LLM cache invalidated for updated models: {invalidated}")
+    except Exception as e:
+        print(f"Could not sync model digests with Ollama: {e}")
+    await job_queue.start()
+    market_data.start_watching()
+    if OLLAMA_WARM_UP:
+        _spawn_background(_warm_up_models())
+    yield
+    market_data.stop_watching()
+    await job_queue.stop()
+    if _background_tasks:
+        await asyncio.wait(_background_tasks, timeout=5)
+    await llm_client.close_client()
+    await github_client.close()
+
+
+def _spawn_background(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def _warm_up_models() -> None:
+    # Load both engines' models and their static prompt prefixes off the request path
+    try:
+        timings = await llm_client.warm_up(
+            [
+                (EVAL_MODEL, EVAL_SYSTEM_PROMPT),
+                (ROADMAP_MODEL, ROADMAP_SYSTEM_PROMPT),
+            ]
+        )
+        print(f"LLM warm-up finished: {timings}")
+    except Exception as e:
+        print(f"LLM warm-up failed: {e}")
+
 
-app = FastAPI(title="CareerOS")
+class BodySizeLimitMiddleware:
+    """
+    Enforce per-path request body limits while the body is received.
 
+    A declared Content-Length over the limit is answered with 413 before
+    any of the body is read. Otherwise bytes are counted as they arrive
+    (this covers chunked uploads), and the request fails with 413 as soon
+    as the limit is crossed, so form parsing never spools more than the
+    limit.
+    """
+
+    def __init__(self, app, limits: dict[str, int]) -> None:
+        self.app = app
+        self.limits = limits
+
+    async def __call__(self, scope, receive, send) -> None:
+        limit = self.limits.get(scope["path"]) if scope["type"] == "http" else None
+        if limit is None:
+            await self.app(scope, receive, send)
+            return
+
+        detail = f"Request body exceeds {limit} bytes"
+        content_length = dict(scope["headers"]).get(b"content-length", b"")
+        if content_length.isdigit() and int(content_length) > limit:
+            await JSONResponse({"detail": detail}, status_code=413)(scope, receive, send)
+            return
+
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > limit:
+                    # Raised inside form parsing; FastAPI passes HTTPException through
+                    raise HTTPException(status_code=413, detail=detail)
+            return message
+
+        await self.app(scope, limited_receive, send)
+
+
+app = FastAPI(title="CareerOS", lifespan=lifespan)
+
+# Added first so it sits inside CORSMiddleware and its 413s carry CORS headers
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    limits={"/analyze-profile": RESUME_MAX_BYTES + PROFILE_FORM_OVERHEAD_BYTES},
+)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -42,53 +191,243 @@ def get_metrics(user_id: str):
     return load_user_metrics(user_id)
 
 
-def _auto_quality_score(submission_text: str) -> int:
-    words = submission_text.strip().split()
-    word_count = len(words)
-    if word_count < 30:
-        score = 40
-    elif word_count <= 80:
-        score = 65
-    else:
-        score = 85
+@app.get("/llm/cache")
+def get_llm_cache_stats():
+    return llm_cache.stats()
 
-    code_like_pattern = re.compile(
-        r"[;{}]|\b(def|class|return|import|for|while|if|else|elif)\b|=>|\bconst\b|\bfunction\b"
-    )
-    if code_like_pattern.search(submission_text):
-        score += 10
 
-    return min(score, 100)
+@app.get("/llm/breaker")
+def get_llm_breaker_state():
+    return llm_client.breaker.snapshot()
+
+
+@app.get("/market-data")
+def get_market_data_state():
+    return market_data.stats()
+
+
+@app.post("/market-data/reload")
+def reload_market_data():
+    reloaded = market_data.reload(force=True)
+    return {"reloaded": reloaded, **market_data.stats()}
+
+
+@app.get("/resume-cache")
+def get_resume_cache_stats():
+    return resume_cache.stats()
+
+
+@app.get("/github-client")
+def get_github_client_stats():
+    return github_client.stats()
+
+
+@app.get("/grading/stats")
+def get_grading_stats():
+    return routing_stats()
+
+
+@app.delete("/llm/cache")
+def invalidate_llm_cache(model: str | None = None):
+    return {"removed": llm_cache.invalidate(model)}
 
 
 @app.post("/submit-task", response_model=SubmitTaskResponse)
-def submit_task(payload: SubmitTaskRequest) -> SubmitTaskResponse:
+async def submit_task(payload: SubmitTaskRequest) -> SubmitTaskResponse:
+    # Speculative grading: the heuristic grade is ready immediately, the LLM
+    # grade is used if it lands within the deadline
+    provisional = provisional_feedback(payload.submission_text)
+    llm_task = asyncio.create_task(
+        grade_submission(
+            payload.submission_text, user_id=payload.user_id, fallback=False
+        )
+    )
+    done, _ = await asyncio.wait({llm_task}, timeout=SUBMIT_TASK_DEADLINE_SECONDS)
+    if llm_task in done:
+        try:
+            feedback = llm_task.result()
+        except Exception:
+            feedback = heuristic_feedback(payload.submission_text)
+        return _record_submission(payload.user_id, feedback)
+
+    # The LLM is only slow: answer provisionally and expose its grade as a job
+    response = _record_submission(payload.user_id, provisional, provisional=True)
+    job = job_queue.track(
+        lambda: _reconcile_submission(payload.user_id, provisional.rating, llm_task)
+    )
+    response.job_id = job.job_id
+    return response
+
+
+async def _reconcile_submission(
+    user_id: str, provisional_score: int, llm_task: asyncio.Task
+) -> SubmitTaskResponse:
+    try:
+        feedback = await llm_task
+    except Exception as e:
+        raise RuntimeError(f"AI grading failed, the provisional grade stands: {e}") from e
+    if feedback.rating != provisional_score:
+        metrics = reconcile_task_submission(user_id, provisional_score, feedback.rating)
+    else:
+        metrics = load_user_metrics(user_id)
+    return _submission_response(metrics, feedback)
+
+
+async def _evaluate_and_record(payload: SubmitTaskRequest) -> SubmitTaskResponse:
     # Use AI evaluation
-    feedback = evaluate_submission(payload.submission_text)
-    quality_score = feedback.rating
+    feedback = await grade_submission(payload.submission_text, user_id=payload.user_id)
+    return _record_submission(payload.user_id, feedback)
 
+
+def _record_submission(
+    user_id: str, feedback: TaskFeedback, provisional: bool = False
+) -> SubmitTaskResponse:
     updated = update_metrics_on_task_submission(
-        payload.user_id,
-        quality_score=quality_score,
+        user_id,
+        quality_score=feedback.rating,
     )
+    return _submission_response(updated, feedback, provisional)
+
 
+def _submission_response(
+    updated: UserMetrics, feedback: TaskFeedback, provisional: bool = False
+) -> SubmitTaskResponse:
     return SubmitTaskResponse(
         xp=updated.xp,
         level=updated.level,
         rank=updated.rank,
         streak=updated.streak,
         execution_score=updated.execution_score,
-        feedback=feedback
+        feedback=feedback,
+        provisional=provisional,
+    )
+
+
+def _job_status(job) -> JobStatusResponse:
+    return JobStatusResponse(
+        job_id=job.job_id,
+        status=job.status,
+        result=job.result,
+        error=job.error,
+    )
+
+
+@app.post("/submit-task/jobs", response_model=JobStatusResponse, status_code=202)
+async def submit_task_job(payload: SubmitTaskRequest) -> JobStatusResponse:
+    job = job_queue.submit(lambda: _evaluate_and_record(payload))
+    return _job_status(job)
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatusResponse)
+async def get_job(job_id: str, wait: float = 0.0) -> JobStatusResponse:
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    await job_queue.wait(job, wait)
+    return _job_status(job)
+
+
+@app.post("/submit-tasks/batch", response_model=BatchSubmitTaskResponse)
+async def submit_tasks_batch(payload: BatchSubmitTaskRequest) -> BatchSubmitTaskResponse:
+    # Batch evaluations queue behind interactive ones for LLM slots
+    feedbacks = await asyncio.gather(
+        *(
+            grade_submission(
+                submission.submission_text,
+                priority=llm_client.PRIORITY_BATCH,
+                user_id=submission.user_id,
+            )
+            for submission in payload.submissions
+        )
+    )
+
+    scores_by_user: dict[str, list[int]] = {}
+    for submission, feedback in zip(payload.submissions, feedbacks):
+        scores_by_user.setdefault(submission.user_id, []).append(feedback.rating)
+
+    users = {}
+    for user_id, quality_scores in scores_by_user.items():
+        updated = update_metrics_on_task_submissions(user_id, quality_scores)
+        users[user_id] = SubmitTaskResponse(
+            xp=updated.xp,
+            level=updated.level,
+            rank=updated.rank,
+            streak=updated.streak,
+            execution_score=updated.execution_score,
+        )
+
+    return BatchSubmitTaskResponse(
+        results=[
+            BatchSubmitTaskResult(user_id=submission.user_id, feedback=feedback)
+            for submission, feedback in zip(payload.submissions, feedbacks)
+        ],
+        users=users,
+    )
+
+
+def _sse_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+@app.post("/submit-task/stream")
+async def submit_task_stream(payload: SubmitTaskRequest) -> StreamingResponse:
+    async def events():
+        yield _sse_event("start", {"user_id": payload.user_id})
+        async for kind, value in stream_evaluation(
+            payload.submission_text, user_id=payload.user_id
+        ):
+            if kind == "field":
+                name, field_value = value
+                yield _sse_event(name, field_value)
+                continue
+
+            response = _record_submission(payload.user_id, value)
+            yield _sse_event("result", response.model_dump())
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _read_resume_upload(resume: UploadFile) -> tuple[bytes, str]:
+    """
+    Read an upload in chunks, hashing it and enforcing RESUME_MAX_BYTES.
+
+    By now Starlette has spooled the file part to a SpooledTemporaryFile
+    (memory up to 1 MB, then disk). BodySizeLimitMiddleware has already
+    capped the whole request body while it was received, so at most
+    RESUME_MAX_BYTES plus form overhead was spooled. This check applies the
+    exact limit to the file itself.
+    """
+    too_large = HTTPException(
+        status_code=413, detail=f"Resume exceeds {RESUME_MAX_BYTES} bytes"
     )
+    if resume.size is not None and resume.size > RESUME_MAX_BYTES:
+        raise too_large
+    digest = hashlib.sha256()
+    chunks = []
+    size = 0
+    while chunk := await resume.read(UPLOAD_CHUNK_BYTES):
+        size += len(chunk)
+        if size > RESUME_MAX_BYTES:
+            raise too_large
+        digest.update(chunk)
+        chunks.append(chunk)
+    return b"".join(chunks), digest.hexdigest()
 
 
 @app.post("/analyze-profile", response_model=ProfileAnalysisResponse)
-def analyze_profile_endpoint(
+async def analyze_profile_endpoint(
     resume: UploadFile | None = File(None),
     github_username: str | None = Form(None),
 ) -> ProfileAnalysisResponse:
-    resume_bytes = resume.file.read() if resume else None
-    result = analyze_profile(resume_bytes, github_username)
+    resume_bytes, digest = await _read_resume_upload(resume) if resume else (None, None)
+    try:
+        result = await analyze_profile(resume_bytes, github_username, digest)
+    except PdfExtractionError:
+        raise HTTPException(status_code=422, detail="Could not read the resume PDF")
     return ProfileAnalysisResponse(**result)
 
 
@@ -101,18 +440,49 @@ def analyze_role_endpoint(request: AnalyzeRoleRequest) -> AnalyzeRoleResponse:
     return AnalyzeRoleResponse(**result)
 
 
+@app.post("/rank-roles", response_model=RankRolesResponse)
+def rank_roles_endpoint(request: RankRolesRequest) -> RankRolesResponse:
+    snapshot = market_data.current()
+    user_skills = list(snapshot.skill_matcher.canonical_skills(request.user_skills))
+    return RankRolesResponse(roles=snapshot.index.rank(user_skills))
+
+
+@app.post("/recommend-roles", response_model=RecommendRolesResponse)
+def recommend_roles_endpoint(request: RecommendRolesRequest) -> RecommendRolesResponse:
+    snapshot = market_data.current()
+    user_skills = list(snapshot.skill_matcher.canonical_skills(request.user_skills))
+    return RecommendRolesResponse(roles=snapshot.inverted_index.top_k(user_skills, k=request.k))
+
+
+@app.post("/analyze-cohort", response_model=CohortAnalysisResponse)
+def analyze_cohort_endpoint(request: CohortAnalysisRequest) -> CohortAnalysisResponse:
+    try:
+        result = analyze_cohort(
+            [user.model_dump() for user in request.users],
+            selected_role=request.selected_role,
+            include_users=request.include_users,
+            top_gaps=request.top_gaps,
+        )
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Role not found")
+    return CohortAnalysisResponse(**result)
+
+
 @app.post("/generate-roadmap", response_model=GenerateRoadmapResponse)
-def generate_roadmap_endpoint(request: GenerateRoadmapRequest) -> GenerateRoadmapResponse:
+async def generate_roadmap_endpoint(request: GenerateRoadmapRequest) -> GenerateRoadmapResponse:
     missing_skills_list = [
         {"skill": skill.skill, "importance": skill.importance}
         for skill in request.missing_skills
     ]
-    result = generate_roadmap(missing_skills_list)
+    result = await generate_roadmap(
+        missing_skills_list,
+        role_context=request.selected_role or DEFAULT_ROLE_CONTEXT,
+    )
     return GenerateRoadmapResponse(**result)
 
 
 @app.post("/generate-career-plan", response_model=GenerateCareerPlanResponse)
-def generate_career_plan_endpoint(
+async def generate_career_plan_endpoint(
     request: GenerateCareerPlanRequest,
 ) -> GenerateCareerPlanResponse:
     role_result = analyze_role(
@@ -120,7 +490,15 @@ def generate_career_plan_endpoint(
         selected_role=request.selected_role,
     )
     missing_skills = role_result.get("missing_skills", [])
-    roadmap_result = generate_roadmap(missing_skills)
+
+    previous = load_user_roadmap(request.user_id) if request.user_id else None
+    roadmap_result = await generate_roadmap(
+        missing_skills,
+        role_context=request.selected_role,
+        previous_weeks=previous["weeks"] if previous else None,
+    )
+    if request.user_id:
+        save_user_roadmap(request.user_id, request.selected_role, roadmap_result["roadmap"])
 
     return GenerateCareerPlanResponse(
         alignment_score=role_result.get("alignment_score", 0.0),
@@ -128,4 +506,56 @@ def generate_career_plan_endpoint(
         roadmap=roadmap_result["roadmap"],
         capstone=roadmap_result["capstone"],
         review=roadmap_result["review"],
+        diff=roadmap_result["diff"] if request.user_id else None,
+    )
+
+
+def _ndjson_line(kind: str, data) -> str:
+    return json.dumps({"type": kind, "data": data}) + "\n"
+
+
+@app.post("/generate-career-plan/stream")
+async def generate_career_plan_stream(request: GenerateCareerPlanRequest) -> StreamingResponse:
+    """
+    Stream the career plan as NDJSON: the role analysis first, then each
+    week as soon as it is ready (in completion order, see its "week"
+    field), then capstone and review, and the diff when a user_id is given.
+    """
+    role_result = analyze_role(
+        user_skills=request.user_skills,
+        selected_role=request.selected_role,
+    )
+    missing_skills = role_result.get("missing_skills", [])
+
+    async def lines():
+        analysis = AnalyzeRoleResponse(
+            alignment_score=role_result.get("alignment_score", 0.0),
+            missing_skills=[MissingSkill(**skill) for skill in missing_skills],
+            market_data_version=role_result.get("market_data_version"),
+        )
+        yield _ndjson_line("analysis", analysis.model_dump())
+
+        previous = load_user_roadmap(request.user_id) if request.user_id else None
+        weeks, diff = plan_roadmap(
+            missing_skills,
+            role_context=request.selected_role,
+            previous_weeks=previous["weeks"] if previous else None,
+        )
+
+        roadmap = []
+        async for week in iter_completed_weeks(weeks):
+            roadmap.append(week)
+            yield _ndjson_line("week", WeekPlan(**week).model_dump())
+
+        yield _ndjson_line("capstone", CAPSTONE_DAY)
+        yield _ndjson_line("review", REVIEW_DAY)
+        if request.user_id:
+            roadmap.sort(key=lambda week: week["week"])
+            save_user_roadmap(request.user_id, request.selected_role, roadmap)
+            yield _ndjson_line("diff", diff)
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
     )
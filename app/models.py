@@ -67,12 +67,38 @@ class SubmitTaskResponse(BaseModel):
     streak: int
     execution_score: float
     feedback: TaskFeedback | None = None
+    provisional: bool = False
+    # Set when provisional: poll /jobs/{job_id} for the final grade and feedback
+    job_id: str | None = None
+
+
+class BatchSubmitTaskRequest(BaseModel):
+    submissions: list[SubmitTaskRequest]
+
+
+class BatchSubmitTaskResult(BaseModel):
+    user_id: str
+    feedback: TaskFeedback
+
+
+class BatchSubmitTaskResponse(BaseModel):
+    results: list[BatchSubmitTaskResult]
+    users: dict[str, SubmitTaskResponse]
+
+
+class JobStatusResponse(BaseModel):
+    job_id: str
+    status: str
+    result: SubmitTaskResponse | None = None
+    error: str | None = None
 
 
 class GithubAnalysis(BaseModel):
     repo_count: int
     primary_languages: list[str]
     language_breakdown: dict[str, int]
+    # True when the user has more repos than were fetched (GITHUB_MAX_PAGES)
+    truncated: bool = False
 
 
 class ProfileAnalysisResponse(BaseModel):
@@ -80,6 +106,8 @@ class ProfileAnalysisResponse(BaseModel):
     soft_skills: list[str]
     experience_level: str
     github_analysis: GithubAnalysis
+    # Sides ("resume", "github") that missed their deadline and came back empty
+    timed_out: list[str] = []
 
 
 class MissingSkill(BaseModel):
@@ -100,6 +128,84 @@ class AnalyzeRoleRequest(BaseModel):
 class AnalyzeRoleResponse(BaseModel):
     alignment_score: float
     missing_skills: list[MissingSkill]
+    market_data_version: str | None = None
+
+
+class RankRolesRequest(BaseModel):
+    user_skills: list[str]
+
+
+class RoleAlignment(BaseModel):
+    role: str
+    alignment_score: float
+
+
+class RankRolesResponse(BaseModel):
+    roles: list[RoleAlignment]
+
+
+class RecommendRolesRequest(BaseModel):
+    user_skills: list[str]
+    k: int = 3
+
+
+class RoleRecommendation(BaseModel):
+    role: str
+    alignment_score: float
+    next_skill: str | None = None
+    alignment_gain: float
+
+
+class RecommendRolesResponse(BaseModel):
+    roles: list[RoleRecommendation]
+
+
+class CohortUser(BaseModel):
+    user_id: str
+    user_skills: list[str]
+
+
+class CohortAnalysisRequest(BaseModel):
+    users: list[CohortUser]
+    selected_role: str | None = None
+    include_users: bool = True
+    top_gaps: int = 10
+
+
+class AlignmentDistribution(BaseModel):
+    mean: float
+    median: float
+    p25: float
+    p75: float
+    min: float
+    max: float
+    histogram: list[int]
+
+
+class CohortSkillGap(BaseModel):
+    skill: str
+    importance: int
+    missing_users: int
+    missing_share: float
+
+
+class CohortRoleSummary(BaseModel):
+    role: str
+    users: int
+    alignment: AlignmentDistribution
+    common_gaps: list[CohortSkillGap]
+
+
+class CohortUserResult(BaseModel):
+    user_id: str
+    role: str
+    alignment_score: float
+    missing_skills: list[str]
+
+
+class CohortAnalysisResponse(BaseModel):
+    roles: list[CohortRoleSummary]
+    users: list[CohortUserResult] | None = None
 
 
 class DailyTask(BaseModel):
@@ -113,6 +219,7 @@ class WeekPlan(BaseModel):
     focus_skill: str
     importance: int
     days: list[DailyTask]
+    source: str = "template"
 
 
 class CapstoneDay(BaseModel):
@@ -121,8 +228,15 @@ class CapstoneDay(BaseModel):
     description: str
 
 
+class RoadmapDiff(BaseModel):
+    reused: list[str]
+    regenerated: list[str]
+    removed: list[str]
+
+
 class GenerateRoadmapRequest(BaseModel):
     missing_skills: list[MissingSkill]
+    selected_role: str | None = None
 
 
 class GenerateRoadmapResponse(BaseModel):
@@ -136,6 +250,7 @@ class GenerateRoadmapResponse(BaseModel):
 class GenerateCareerPlanRequest(BaseModel):
     user_skills: list[str]
     selected_role: str
+    user_id: str | None = None
 
 
 class GenerateCareerPlanResponse(BaseModel):
@@ -144,3 +259,4 @@ class GenerateCareerPlanResponse(BaseModel):
     roadmap: list[WeekPlan]
     capstone: CapstoneDay
     review: CapstoneDay
+    diff: RoadmapDiff | None = None
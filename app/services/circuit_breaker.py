@@ -0,0 +1,158 @@
+"""
+Circuit breaker for LLM calls.
+
+Tracks a rolling window of call outcomes and latencies. The breaker opens when
+either the error rate or the p95 latency exceeds its budget, rejects calls
+while open, and after a cool-down lets a single probe through (half-open) to
+decide whether to close again.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import threading
+import time
+from collections import deque
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+BREAKER_WINDOW_SECONDS = float(os.getenv("LLM_BREAKER_WINDOW_SECONDS", "60"))
+BREAKER_MIN_CALLS = int(os.getenv("LLM_BREAKER_MIN_CALLS", "5"))
+BREAKER_ERROR_RATE = float(os.getenv("LLM_BREAKER_ERROR_RATE", "0.5"))
+BREAKER_P95_SECONDS = float(os.getenv("LLM_BREAKER_P95_SECONDS", "30"))
+BREAKER_OPEN_SECONDS = float(os.getenv("LLM_BREAKER_OPEN_SECONDS", "30"))
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of making a call while the breaker is open."""
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        window_seconds: float = BREAKER_WINDOW_SECONDS,
+        min_calls: int = BREAKER_MIN_CALLS,
+        error_rate_threshold: float = BREAKER_ERROR_RATE,
+        p95_latency_threshold: float = BREAKER_P95_SECONDS,
+        open_seconds: float = BREAKER_OPEN_SECONDS,
+    ) -> None:
+        self.name = name
+        self.window_seconds = window_seconds
+        self.min_calls = min_calls
+        self.error_rate_threshold = error_rate_threshold
+        self.p95_latency_threshold = p95_latency_threshold
+        self.open_seconds = open_seconds
+        self.state = STATE_CLOSED
+        self.opened_at: float | None = None
+        self.rejected = 0
+        self.transitions: deque[dict] = deque(maxlen=50)
+        self._calls: deque[tuple[float, bool, float]] = deque()
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """Admit a call or raise CircuitOpenError."""
+        with self._lock:
+            now = time.time()
+            if self.state == STATE_OPEN:
+                if now - (self.opened_at or now) < self.open_seconds:
+                    self.rejected += 1
+                    raise CircuitOpenError(f"{self.name} circuit is open")
+                self._transition(STATE_HALF_OPEN, "cool-down elapsed")
+            if self.state == STATE_HALF_OPEN:
+                if self._probe_in_flight:
+                    self.rejected += 1
+                    raise CircuitOpenError(f"{self.name} circuit is half-open")
+                self._probe_in_flight = True
+
+    def record_success(self, latency: float) -> None:
+        self._record(True, latency)
+
+    def record_failure(self, latency: float) -> None:
+        self._record(False, latency)
+
+    def record_abandoned(self) -> None:
+        """Forget an admitted call that ended without an outcome (e.g. cancelled)."""
+        with self._lock:
+            if self.state == STATE_HALF_OPEN:
+                self._probe_in_flight = False
+
+    def _record(self, ok: bool, latency: float) -> None:
+        with self._lock:
+            now = time.time()
+            if self.state == STATE_HALF_OPEN:
+                self._probe_in_flight = False
+                if ok and latency <= self.p95_latency_threshold:
+                    self._calls.clear()
+                    self._transition(STATE_CLOSED, "probe succeeded")
+                else:
+                    self._open(now, "probe failed" if not ok else "probe too slow")
+                return
+
+            self._calls.append((now, ok, latency))
+            self._prune(now)
+            if self.state != STATE_CLOSED or len(self._calls) < self.min_calls:
+                return
+            error_rate = self._error_rate()
+            if error_rate >= self.error_rate_threshold:
+                self._open(now, f"error rate {error_rate:.0%}")
+                return
+            p95 = self._p95()
+            if p95 >= self.p95_latency_threshold:
+                self._open(now, f"p95 latency {p95:.1f}s")
+
+    def _open(self, now: float, reason: str) -> None:
+        self.opened_at = now
+        self._transition(STATE_OPEN, reason)
+
+    def _transition(self, state: str, reason: str) -> None:
+        if state == self.state:
+            return
+        print(f"Circuit {self.name}: {self.state} -> {state} ({reason})")
+        self.transitions.append(
+            {"at": time.time(), "from": self.state, "to": state, "reason": reason}
+        )
+        self.state = state
+
+    def _prune(self, now: float) -> None:
+        cutoff = now - self.window_seconds
+        while self._calls and self._calls[0][0] < cutoff:
+            self._calls.popleft()
+
+    def _error_rate(self) -> float:
+        if not self._calls:
+            return 0.0
+        failures = sum(1 for _, ok, _ in self._calls if not ok)
+        return failures / len(self._calls)
+
+    def _p95(self) -> float:
+        if not self._calls:
+            return 0.0
+        latencies = sorted(latency for _, _, latency in self._calls)
+        index = max(0, math.ceil(0.95 * len(latencies)) - 1)
+        return latencies[index]
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            self._prune(time.time())
+            return {
+                "name": self.name,
+                "state": self.state,
+                "opened_at": self.opened_at,
+                "window_calls": len(self._calls),
+                "error_rate": round(self._error_rate(), 4),
+                "p95_latency": round(self._p95(), 3),
+                "rejected": self.rejected,
+                "thresholds": {
+                    "window_seconds": self.window_seconds,
+                    "min_calls": self.min_calls,
+                    "error_rate": self.error_rate_threshold,
+                    "p95_latency": self.p95_latency_threshold,
+                    "open_seconds": self.open_seconds,
+                },
+                "transitions": list(self.transitions),
+            }
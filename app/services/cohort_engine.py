@@ -0,0 +1,175 @@
+"""
+Cohort gap analysis: alignment and missing skills for many users at once.
+
+The cohort's skills are held as a sparse user-by-skill matrix in CSR form
+(indptr/indices arrays over the role index vocabulary), so memory grows with
+the number of (user, skill) pairs rather than users x vocabulary. Earned
+weight for every (user, role) is the sparse matrix times the role-weight
+matrix, computed as one gather plus a per-role bincount.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+import numpy as np
+
+from app.services.market_data import MarketSnapshot, market_data
+from app.services.role_index import RoleIndex, normalize_skill
+
+# Alignment histogram buckets: [0, 10), [10, 20), ..., [90, 100]
+HISTOGRAM_EDGES = np.linspace(0, 100, 11)
+DEFAULT_TOP_GAPS = 10
+
+
+class CohortMatrix:
+    """Users' skills as a CSR matrix over the role index vocabulary."""
+
+    def __init__(self, user_skills: list[Iterable[str]], index: RoleIndex) -> None:
+        rows = [
+            sorted(
+                {
+                    index.skill_ids[skill]
+                    for skill in map(normalize_skill, skills)
+                    if skill in index.skill_ids
+                }
+            )
+            for skills in user_skills
+        ]
+        self.n_users = len(rows)
+        self.indptr = np.zeros(self.n_users + 1, dtype=np.int64)
+        np.cumsum([len(row) for row in rows], out=self.indptr[1:])
+        self.indices = np.fromiter(
+            (skill_id for row in rows for skill_id in row),
+            dtype=np.int64,
+            count=int(self.indptr[-1]),
+        )
+        # Row number of every non-zero entry, for scatter-adds back to users
+        self.row_ids = np.repeat(np.arange(self.n_users), np.diff(self.indptr))
+
+    def row(self, user: int) -> np.ndarray:
+        return self.indices[self.indptr[user] : self.indptr[user + 1]]
+
+    def earned_weights(self, weights: np.ndarray) -> np.ndarray:
+        """(users x roles) matrix product of the cohort with `weights` (roles x vocabulary)."""
+        earned = np.zeros((self.n_users, len(weights)), dtype=np.float64)
+        for col, role_weights in enumerate(weights[:, self.indices]):
+            earned[:, col] = np.bincount(
+                self.row_ids, weights=role_weights, minlength=self.n_users
+            )
+        return earned
+
+    def skill_counts(self, vocabulary_size: int) -> np.ndarray:
+        """Number of users having each vocabulary skill."""
+        return np.bincount(self.indices, minlength=vocabulary_size)
+
+
+def _alignment_summary(scores: np.ndarray) -> dict:
+    histogram, _ = np.histogram(scores, bins=HISTOGRAM_EDGES)
+    if scores.size == 0:
+        scores = np.zeros(1)
+    p25, median, p75 = np.percentile(scores, [25, 50, 75])
+    return {
+        "mean": round(float(scores.mean()), 2),
+        "median": round(float(median), 2),
+        "p25": round(float(p25), 2),
+        "p75": round(float(p75), 2),
+        "min": round(float(scores.min()), 2),
+        "max": round(float(scores.max()), 2),
+        "histogram": histogram.tolist(),
+    }
+
+
+def analyze_cohort(
+    users: list[dict],
+    selected_role: str | None = None,
+    include_users: bool = True,
+    top_gaps: int = DEFAULT_TOP_GAPS,
+    snapshot: MarketSnapshot | None = None,
+) -> dict:
+    """
+    Run gap analysis for a whole cohort against one role or all roles.
+
+    Args:
+        users: List of dicts with 'user_id' and 'user_skills'
+        selected_role: Role to analyze against; all roles if None
+        include_users: Include per-user alignment and missing skills
+        top_gaps: Number of most common missing skills reported per role
+        snapshot: Market data snapshot to score against; the current one if None
+
+    Returns:
+        Dict with per-role aggregate 'roles' and, optionally, per-user 'users'
+
+    Raises:
+        KeyError: If selected_role is not a known role
+    """
+    snapshot = snapshot or market_data.current()
+    index = snapshot.index
+    if selected_role is None:
+        role_rows = list(range(len(index.roles)))
+    elif selected_role in index.roles:
+        role_rows = [index.roles.index(selected_role)]
+    else:
+        raise KeyError(selected_role)
+
+    cohort = CohortMatrix(
+        [snapshot.skill_matcher.canonical_skills(user.get("user_skills", [])) for user in users],
+        index,
+    )
+    weights = index.weights[role_rows]
+    totals = index.totals[role_rows]
+    earned = cohort.earned_weights(weights)
+    scores = np.round(
+        np.divide(earned * 100, totals, out=np.zeros_like(earned), where=totals > 0), 2
+    )
+    have_counts = cohort.skill_counts(len(index.vocabulary))
+
+    roles = []
+    for col, row in enumerate(role_rows):
+        role_skills = index.role_skill_ids[row]
+        missing_counts = cohort.n_users - have_counts[role_skills]
+        # Most users missing first; ties keep the role's importance order
+        order = np.argsort(-missing_counts, kind="stable")[:top_gaps]
+        roles.append(
+            {
+                "role": index.roles[row],
+                "users": cohort.n_users,
+                "alignment": _alignment_summary(scores[:, col]),
+                "common_gaps": [
+                    {
+                        "skill": index.vocabulary[role_skills[i]],
+                        "importance": int(index.weights[row, role_skills[i]]),
+                        "missing_users": int(missing_counts[i]),
+                        "missing_share": round(float(missing_counts[i]) / cohort.n_users, 4)
+                        if cohort.n_users
+                        else 0.0,
+                    }
+                    for i in order
+                    if missing_counts[i] > 0
+                ],
+            }
+        )
+
+    result = {"roles": roles}
+    if include_users:
+        # Per-user rows are tiny, so plain sets beat NumPy set operations here
+        role_skills = [
+            [(i, index.vocabulary[i]) for i in index.role_skill_ids[row].tolist()]
+            for row in role_rows
+        ]
+        score_rows = scores.tolist()
+        result["users"] = []
+        for u, user in enumerate(users):
+            user_skill_ids = set(cohort.row(u).tolist())
+            for col, row in enumerate(role_rows):
+                result["users"].append(
+                    {
+                        "user_id": user["user_id"],
+                        "role": index.roles[row],
+                        "alignment_score": score_rows[u][col],
+                        "missing_skills": [
+                            skill for i, skill in role_skills[col] if i not in user_skill_ids
+                        ],
+                    }
+                )
+    return result
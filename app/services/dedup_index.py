@@ -0,0 +1,130 @@
+"""
+Near-duplicate submission index.
+
+Each submission is fingerprinted with a 64-bit SimHash over word bigrams.
+Fingerprints live in a fixed-capacity NumPy ring buffer (8 bytes each plus a
+scope id), so memory is bounded by DEDUP_MAX_ENTRIES and the oldest entries
+are overwritten first. A lookup is one vectorised XOR + popcount over the
+buffer, which stays well under a millisecond for hundreds of thousands of
+entries.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import re
+import threading
+
+import numpy as np
+
+from app.models import TaskFeedback
+
+DEDUP_ENABLED = os.getenv("DEDUP_ENABLED", "1") != "0"
+DEDUP_MAX_ENTRIES = int(os.getenv("DEDUP_MAX_ENTRIES", "200000"))
+DEDUP_MAX_HAMMING = int(os.getenv("DEDUP_MAX_HAMMING", "8"))
+# Rating multiplier applied when the match came from a different user
+DEDUP_PEER_RATING_FACTOR = float(os.getenv("DEDUP_PEER_RATING_FACTOR", "1.0"))
+DEDUP_MIN_WORDS = 8
+
+FINGERPRINT_BITS = 64
+SHINGLE_SIZE = 2
+
+TOKEN_PATTERN = re.compile(r"\w+")
+_BIT_SHIFTS = np.arange(FINGERPRINT_BITS, dtype=np.uint64)
+
+
+def simhash(text: str) -> int | None:
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    if len(tokens) < DEDUP_MIN_WORDS:
+        return None
+    shingles = {
+        " ".join(tokens[i : i + SHINGLE_SIZE])
+        for i in range(len(tokens) - SHINGLE_SIZE + 1)
+    }
+    hashes = np.fromiter(
+        (
+            int.from_bytes(
+                hashlib.blake2b(shingle.encode("utf-8"), digest_size=8).digest(), "big"
+            )
+            for shingle in shingles
+        ),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+    bits = (hashes[:, None] >> _BIT_SHIFTS) & np.uint64(1)
+    # A bit is set when more than half of the shingles have it set
+    votes = bits.sum(axis=0) * 2 > len(shingles)
+    return int((votes.astype(np.uint64) << _BIT_SHIFTS).sum())
+
+
+class DedupIndex:
+    def __init__(
+        self,
+        max_entries: int = DEDUP_MAX_ENTRIES,
+        max_hamming: int = DEDUP_MAX_HAMMING,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_hamming = max_hamming
+        self.hits = 0
+        self.misses = 0
+        self._fingerprints = np.zeros(max_entries, dtype=np.uint64)
+        self._scopes = np.full(max_entries, -1, dtype=np.int32)
+        self._payloads: list[tuple[TaskFeedback, str | None] | None] = [None] * max_entries
+        self._scope_ids: dict[str, int] = {}
+        self._next = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def lookup(
+        self, scope: str, fingerprint: int
+    ) -> tuple[TaskFeedback, str | None, int] | None:
+        """Return (feedback, user_id, hamming distance) of the closest match, if any."""
+        with self._lock:
+            scope_id = self._scope_ids.get(scope)
+            if scope_id is None or self._size == 0:
+                self.misses += 1
+                return None
+            distances = np.bitwise_count(
+                self._fingerprints[: self._size] ^ np.uint64(fingerprint)
+            )
+            candidates = np.flatnonzero(distances <= self.max_hamming)
+            candidates = candidates[self._scopes[candidates] == scope_id]
+            if candidates.size == 0:
+                self.misses += 1
+                return None
+            slot = int(candidates[distances[candidates].argmin()])
+            distance = int(distances[slot])
+            feedback, user_id = self._payloads[slot]
+            self.hits += 1
+            return feedback, user_id, distance
+
+    def add(
+        self, scope: str, fingerprint: int, feedback: TaskFeedback, user_id: str | None = None
+    ) -> None:
+        with self._lock:
+            scope_id = self._scope_ids.setdefault(scope, len(self._scope_ids))
+            slot = self._next
+            self._fingerprints[slot] = fingerprint
+            self._scopes[slot] = scope_id
+            self._payloads[slot] = (feedback, user_id)
+            self._next = (slot + 1) % self.max_entries
+            self._size = min(self._size + 1, self.max_entries)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": DEDUP_ENABLED,
+            "entries": self._size,
+            "max_entries": self.max_entries,
+            "max_hamming": self.max_hamming,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+dedup_index = DedupIndex()
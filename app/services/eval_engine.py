@@ -1,64 +1,320 @@
 import json
-import requests
+from collections import Counter, defaultdict
+from typing import Any, AsyncIterator
+
 from app.models import TaskFeedback
+from app.services import llm_client
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.dedup_index import (
+    DEDUP_ENABLED,
+    DEDUP_PEER_RATING_FACTOR,
+    dedup_index,
+    simhash,
+)
+from app.services.heuristic_scorer import heuristic_feedback, pre_score
+
+EVAL_MODEL = "llama3:latest"
+EVAL_TIMEOUT = 120
+EVAL_OPTIONS = {
+    "temperature": 0.0,
+    "num_predict": 150,
+    "top_k": 20
+}
+
+# Pre-scorer routing decisions, keyed by reason ("ambiguous" = sent to the LLM)
+ROUTING_STATS: Counter = Counter()
+# Per reason, the summed pre-scorer features of the submissions routed that way,
+# so thresholds can be tuned against what actually reaches the LLM
+ROUTING_FEATURE_TOTALS: defaultdict[str, Counter] = defaultdict(Counter)
+
+
+# Static instructions go in the system prompt so Ollama can reuse their
+# evaluated tokens across calls; only context and answer vary per request
+EVAL_SYSTEM_PROMPT = (
+    "Role: Strict Technical Interviewer. Evaluate answer. Return ONLY JSON.\n"
+    "Criteria: Brutal grading. Score < 10 for irrelevant/dumb answers. Vauge = Low score.\n"
+    "JSON Format:\n"
+    "{\n"
+    '  "rating": <0-100>,\n'
+    '  "mistakes": ["list of flaws"],\n'
+    '  "correct_approach": "what was actually needed",\n'
+    '  "improvements": ["next steps"]\n'
+    "}"
+)
+
+
+def _build_prompt(submission_text: str, task_context: str) -> str:
+    return f"Context: {task_context}. Answer: {submission_text}"
 
-OLLAMA_URL = "http://127.0.0.1:11434/api/generate"
-
-def evaluate_submission(submission_text: str, task_context: str = "System Design") -> TaskFeedback:
-    prompt = (
-        "Role: Strict Technical Interviewer. Evaluate answer. Return ONLY JSON.\n"
-        "Criteria: Brutal grading. Score < 10 for irrelevant/dumb answers. Vauge = Low score.\n"
-        f"Context: {task_context}. Answer: {submission_text}\n\n"
-        "JSON Format:\n"
-        "{\n"
-        '  "rating": <0-100>,\n'
-        '  "mistakes": ["list of flaws"],\n'
-        '  "correct_approach": "what was actually needed",\n'
-        '  "improvements": ["next steps"]\n'
-        "}"
+
+def _feedback_from_dict(data: dict) -> TaskFeedback:
+    # Ensure all fields exist
+    return TaskFeedback(
+        rating=int(data.get("rating", 0)),
+        mistakes=data.get("mistakes", []),
+        correct_approach=data.get("correct_approach", "Review technical documentation."),
+        improvements=data.get("improvements", [])
     )
 
+
+def _parse_feedback(raw_response: str) -> TaskFeedback:
+    # Robust JSON extraction
+    if "{" in raw_response and "}" in raw_response:
+        start = raw_response.find("{")
+        end = raw_response.rfind("}")
+        raw_response = raw_response[start:end+1]
+
+    return _feedback_from_dict(json.loads(raw_response))
+
+
+def _fallback_feedback() -> TaskFeedback:
+    return TaskFeedback(
+        rating=70,
+        mistakes=["Unable to perform AI analysis at this time."],
+        correct_approach="Please review standard documentation for this topic.",
+        improvements=["Try providing more technical detail in your next answer."]
+    )
+
+
+class FeedbackStreamParser:
+    """
+    Incremental parser for the top-level fields of the feedback JSON object.
+
+    Text is fed chunk by chunk as tokens arrive; feed() returns every
+    (field, value) pair whose value became complete within that chunk.
+    Any prose the model emits before the opening brace is skipped.
+    """
+
+    def __init__(self) -> None:
+        self.text = ""
+        self.fields: dict[str, Any] = {}
+        self.done = False
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect_key = True
+        self._token_start = 0
+        self._key: str | None = None
+
+    def feed(self, chunk: str) -> list[tuple[str, Any]]:
+        self.text += chunk
+        completed = []
+        text = self.text
+        while self._pos < len(text) and not self.done:
+            i = self._pos
+            ch = text[i]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect_key:
+                        self._key = json.loads(text[self._token_start : i + 1])
+                continue
+
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._expect_key = True
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect_key:
+                    self._token_start = i
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                if self._depth == 1:
+                    completed.extend(self._finish_value(i))
+                    self.done = True
+                self._depth -= 1
+            elif self._depth == 1 and ch == ":":
+                self._expect_key = False
+                self._token_start = i + 1
+            elif self._depth == 1 and ch == ",":
+                completed.extend(self._finish_value(i))
+                self._expect_key = True
+        return completed
+
+    def _finish_value(self, end: int) -> list[tuple[str, Any]]:
+        if self._expect_key or self._key is None:
+            return []
+        raw = self.text[self._token_start : end].strip()
+        key, self._key = self._key, None
+        try:
+            value = json.loads(raw)
+        except ValueError:
+            return []
+        self.fields[key] = value
+        return [(key, value)]
+
+
+def _route_locally(submission_text: str, task_context: str) -> TaskFeedback | None:
+    reason, feedback, features = pre_score(submission_text, task_context)
+    ROUTING_STATS[reason] += 1
+    ROUTING_FEATURE_TOTALS[reason].update(features)
+    return feedback
+
+
+def routing_stats() -> dict:
+    sent_to_llm = ROUTING_STATS["ambiguous"]
+    total = sum(ROUTING_STATS.values())
+    return {
+        "total": total,
+        "settled_locally": total - sent_to_llm,
+        "sent_to_llm": sent_to_llm,
+        "llm_calls_saved_ratio": round((total - sent_to_llm) / total, 4) if total else 0.0,
+        "reasons": dict(ROUTING_STATS),
+        "mean_features": {
+            reason: {
+                name: round(value / ROUTING_STATS[reason], 4) for name, value in totals.items()
+            }
+            for reason, totals in ROUTING_FEATURE_TOTALS.items()
+        },
+        "dedup": dedup_index.stats(),
+    }
+
+
+async def grade_submission(
+    submission_text: str,
+    task_context: str = "System Design",
+    priority: int = llm_client.PRIORITY_INTERACTIVE,
+    user_id: str | None = None,
+    fallback: bool = True,
+) -> TaskFeedback:
+    """
+    Tiered grading: settle clear cases locally, send the rest to the LLM.
+    """
+    settled = _route_locally(submission_text, task_context)
+    if settled is not None:
+        return settled
+    return await evaluate_submission(
+        submission_text, task_context, priority, user_id, fallback
+    )
+
+
+def _reuse_feedback(
+    feedback: TaskFeedback, owner_id: str | None, user_id: str | None
+) -> TaskFeedback:
+    if owner_id is None or owner_id == user_id or DEDUP_PEER_RATING_FACTOR == 1.0:
+        return feedback
+    return feedback.model_copy(
+        update={
+            "rating": round(feedback.rating * DEDUP_PEER_RATING_FACTOR),
+            "mistakes": [
+                "This answer is nearly identical to another learner's submission.",
+                *feedback.mistakes,
+            ],
+        }
+    )
+
+
+async def evaluate_submission(
+    submission_text: str,
+    task_context: str = "System Design",
+    priority: int = llm_client.PRIORITY_INTERACTIVE,
+    user_id: str | None = None,
+    fallback: bool = True,
+) -> TaskFeedback:
+    """
+    Grade a submission with the LLM, reusing feedback for near-duplicates.
+
+    With fallback=False, LLM failures (including an open circuit) are raised
+    instead of being replaced by a fallback grade.
+    """
+    fingerprint = simhash(submission_text) if DEDUP_ENABLED else None
+    if fingerprint is not None:
+        match = dedup_index.lookup(task_context, fingerprint)
+        if match is not None:
+            feedback, owner_id, _ = match
+            return _reuse_feedback(feedback, owner_id, user_id)
+
+    prompt = _build_prompt(submission_text, task_context)
+
     try:
-        resp = requests.post(
-            OLLAMA_URL,
-            json={
-                "model": "llama3:latest",
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.0,
-                    "num_predict": 150,
-                    "top_k": 20
-                }
-            },
-            timeout=120
+        feedback = await llm_client.generate(
+            EVAL_MODEL,
+            prompt,
+            options=EVAL_OPTIONS,
+            timeout=EVAL_TIMEOUT,
+            parse=_parse_feedback,
+            priority=priority,
+            system=EVAL_SYSTEM_PROMPT,
         )
-        resp.raise_for_status()
-        
-        raw_response = resp.json().get("response", "").strip()
-        
-        # Robust JSON extraction
-        if "{" in raw_response and "}" in raw_response:
-            start = raw_response.find("{")
-            end = raw_response.rfind("}")
-            raw_response = raw_response[start:end+1]
-            
-        data = json.loads(raw_response)
-        
-        # Ensure all fields exist
-        return TaskFeedback(
-            rating=int(data.get("rating", 0)),
-            mistakes=data.get("mistakes", []),
-            correct_approach=data.get("correct_approach", "Review technical documentation."),
-            improvements=data.get("improvements", [])
-        )
-        
+        if fingerprint is not None:
+            dedup_index.add(task_context, fingerprint, feedback, user_id)
+        return feedback
+
+    except CircuitOpenError:
+        if not fallback:
+            raise
+        # Don't wait on a struggling LLM; grade locally straight away
+        return heuristic_feedback(submission_text)
+
     except Exception as e:
         print(f"AI Evaluation failed: {e}")
+        if not fallback:
+            raise
         # Fallback evaluation
-        return TaskFeedback(
-            rating=70,
-            mistakes=["Unable to perform AI analysis at this time."],
-            correct_approach="Please review standard documentation for this topic.",
-            improvements=["Try providing more technical detail in your next answer."]
+        return _fallback_feedback()
+
+
+async def stream_evaluation(
+    submission_text: str,
+    task_context: str = "System Design",
+    user_id: str | None = None,
+) -> AsyncIterator[tuple[str, Any]]:
+    """
+    Streaming variant of grade_submission.
+
+    Yields ("field", (name, value)) as soon as each top-level feedback field
+    is complete, then a final ("feedback", TaskFeedback).
+    """
+    settled = _route_locally(submission_text, task_context)
+    fingerprint = None
+    if settled is None and DEDUP_ENABLED:
+        fingerprint = simhash(submission_text)
+        match = dedup_index.lookup(task_context, fingerprint) if fingerprint is not None else None
+        if match is not None:
+            feedback, owner_id, _ = match
+            settled = _reuse_feedback(feedback, owner_id, user_id)
+    if settled is not None:
+        for name, value in settled.model_dump().items():
+            yield "field", (name, value)
+        yield "feedback", settled
+        return
+
+    prompt = _build_prompt(submission_text, task_context)
+    parser = FeedbackStreamParser()
+
+    try:
+        async for token in llm_client.stream_generate(
+            EVAL_MODEL,
+            prompt,
+            options=EVAL_OPTIONS,
+            timeout=EVAL_TIMEOUT,
+            parse=_parse_feedback,
+            system=EVAL_SYSTEM_PROMPT,
+        ):
+            for field in parser.feed(token):
+                yield "field", field
+        feedback = (
+            _feedback_from_dict(parser.fields)
+            if parser.done
+            else _parse_feedback(parser.text)
         )
+        if fingerprint is not None:
+            dedup_index.add(task_context, fingerprint, feedback, user_id)
+    except CircuitOpenError:
+        feedback = heuristic_feedback(submission_text)
+    except Exception as e:
+        print(f"AI Evaluation failed: {e}")
+        feedback = _fallback_feedback()
+
+    yield "feedback", feedback
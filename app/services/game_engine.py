@@ -44,8 +44,12 @@ def apply_task_submission(
     streak: int,
     assigned_increment: int = 1,
     completed_increment: int = 1,
+    previous_quality_score: int | None = None,
 ) -> UserMetrics:
     xp_gain = calculate_xp_gain(quality_score, streak)
+    if previous_quality_score is not None:
+        # Re-grade of an already counted submission: only the difference applies
+        xp_gain -= calculate_xp_gain(previous_quality_score, streak)
     metrics.xp += xp_gain
     metrics.streak = streak
     metrics.total_assigned_tasks += assigned_increment
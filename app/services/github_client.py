@@ -0,0 +1,386 @@
+"""
+Async GitHub REST client with conditional requests and rate-limit backoff.
+
+One pooled httpx.AsyncClient is shared by every caller. Responses are cached
+in SQLite by URL together with their ETag:
+
+- while a response is within its Cache-Control max-age it is served without
+  a request at all
+- after that it is revalidated with If-None-Match; a 304 reuses the cached
+  body and does not count against GitHub's primary rate limit
+
+The cache is a SQLiteCache; its blocking I/O runs in a worker thread, and a
+hit rewrites last_access at most once per GITHUB_CACHE_TOUCH_INTERVAL_SECONDS.
+
+Paginated listings fetch the first page, read the last page number from the
+Link header and fetch the remaining pages concurrently, up to
+GITHUB_MAX_PAGES pages; a longer listing is reported as truncated.
+
+Rate limits are tracked from the X-RateLimit-* headers. A request that would
+hit an exhausted limit, or that gets a 403/429 rate-limit response, waits for
+the reset (or Retry-After) when that is at most GITHUB_MAX_BACKOFF_SECONDS
+away; otherwise a cached response is served stale if there is one, and
+GitHubRateLimited is raised if there is not. Set GITHUB_TOKEN to raise the
+limit from 60 to 5000 requests per hour.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+import re
+import time
+from email.utils import parsedate_to_datetime
+from pathlib import Path
+from urllib.parse import parse_qs, quote, urlencode, urlsplit
+
+import httpx
+
+from app.services.sqlite_cache import SQLiteCache
+
+GITHUB_API_URL = os.getenv("GITHUB_API_URL", "https://api.github.com")
+GITHUB_TOKEN = os.getenv("GITHUB_TOKEN") or None
+GITHUB_PER_PAGE = 100
+GITHUB_MAX_PAGES = int(os.getenv("GITHUB_MAX_PAGES", "10"))
+GITHUB_MAX_CONNECTIONS = int(os.getenv("GITHUB_MAX_CONNECTIONS", "10"))
+GITHUB_TIMEOUT = float(os.getenv("GITHUB_TIMEOUT", "10"))
+GITHUB_MAX_RETRIES = int(os.getenv("GITHUB_MAX_RETRIES", "2"))
+GITHUB_MAX_BACKOFF_SECONDS = float(os.getenv("GITHUB_MAX_BACKOFF_SECONDS", "10"))
+GITHUB_RETRY_BASE_SECONDS = 0.5
+GITHUB_KEEPALIVE_EXPIRY = 60.0
+
+GITHUB_CACHE_PATH = Path(__file__).resolve().parent.parent / "data" / "github_cache.sqlite3"
+GITHUB_CACHE_ENABLED = os.getenv("GITHUB_CACHE_ENABLED", "1") != "0"
+GITHUB_CACHE_MAX_ENTRIES = int(os.getenv("GITHUB_CACHE_MAX_ENTRIES", "2000"))
+GITHUB_CACHE_TOUCH_INTERVAL_SECONDS = int(os.getenv("GITHUB_CACHE_TOUCH_INTERVAL_SECONDS", "600"))
+
+MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+LAST_PAGE_PATTERN = re.compile(r'<([^>]+)>\s*;\s*rel="last"')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    etag TEXT,
+    body TEXT NOT NULL,
+    link TEXT,
+    fresh_until REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);
+"""
+
+
+class GitHubError(Exception):
+    """Raised when GitHub could not be queried."""
+
+
+class GitHubNotFound(GitHubError):
+    """Raised on a 404, e.g. for a user that does not exist."""
+
+
+class GitHubRateLimited(GitHubError):
+    """Raised when the rate limit resets too far in the future to wait for."""
+
+    def __init__(self, retry_in: float) -> None:
+        super().__init__(f"rate limited for another {retry_in:.0f}s")
+        self.retry_in = retry_in
+
+
+class CachedResponse:
+    def __init__(self, etag: str | None, body, link: str | None, fresh_until: float) -> None:
+        self.etag = etag
+        self.body = body
+        self.link = link
+        self.fresh_until = fresh_until
+
+
+class GitHubPage:
+    def __init__(self, body, link: str | None, source: str) -> None:
+        self.body = body
+        self.link = link
+        # "network", "not_modified", "fresh" or "stale"
+        self.source = source
+
+    @property
+    def last_page(self) -> int:
+        """Last page number advertised by the Link header (1 if unpaginated)."""
+        match = LAST_PAGE_PATTERN.search(self.link or "")
+        if not match:
+            return 1
+        pages = parse_qs(urlsplit(match.group(1)).query).get("page")
+        return int(pages[0]) if pages else 1
+
+
+class GitHubCache(SQLiteCache):
+    def __init__(self, path: Path, max_entries: int = GITHUB_CACHE_MAX_ENTRIES) -> None:
+        super().__init__(path, _SCHEMA, "responses", "url", GITHUB_CACHE_TOUCH_INTERVAL_SECONDS)
+        self.max_entries = max_entries
+
+    def get(self, url: str) -> CachedResponse | None:
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT etag, body, link, fresh_until, last_access FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._touch(conn, url, row[4], time.time())
+        return CachedResponse(row[0], json.loads(row[1]), row[2], row[3])
+
+    def put(self, url: str, etag: str | None, body, link: str | None, fresh_until: float) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(url, etag, body, link, fresh_until, last_access) VALUES (?, ?, ?, ?, ?, ?)",
+                (url, etag, json.dumps(body), link, fresh_until, time.time()),
+            )
+            self._evict_lru(conn, self.max_entries)
+            conn.commit()
+
+    def refresh(self, url: str, fresh_until: float) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "UPDATE responses SET fresh_until = ?, last_access = ? WHERE url = ?",
+                (fresh_until, time.time(), url),
+            )
+            conn.commit()
+
+    def clear(self) -> int:
+        with self._lock:
+            conn = self._connection()
+            removed = conn.execute("DELETE FROM responses").rowcount
+            conn.commit()
+            return removed
+
+    def entries(self) -> int:
+        return self._count()
+
+
+def _max_age(response: httpx.Response) -> float:
+    match = MAX_AGE_PATTERN.search(response.headers.get("cache-control", ""))
+    return float(match.group(1)) if match else 0.0
+
+
+def _retry_after(response: httpx.Response) -> float | None:
+    value = response.headers.get("retry-after")
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+
+
+class GitHubClient:
+    def __init__(
+        self,
+        base_url: str = GITHUB_API_URL,
+        token: str | None = GITHUB_TOKEN,
+        cache: GitHubCache | None = None,
+        max_backoff: float = GITHUB_MAX_BACKOFF_SECONDS,
+        max_retries: int = GITHUB_MAX_RETRIES,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.token = token
+        self.cache = cache
+        self.max_backoff = max_backoff
+        self.max_retries = max_retries
+        # Last seen X-RateLimit-Remaining / X-RateLimit-Reset (epoch seconds)
+        self.rate_limit_remaining: int | None = None
+        self.rate_limit_reset: float | None = None
+        self.counts = {
+            "requests": 0,
+            "not_modified": 0,
+            "fresh_hits": 0,
+            "stale_hits": 0,
+            "rate_limit_waits": 0,
+            "retries": 0,
+        }
+        self._client: httpx.AsyncClient | None = None
+
+    def _get_client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            headers = {
+                "Accept": "application/vnd.github+json",
+                "X-GitHub-Api-Version": "2022-11-28",
+            }
+            if self.token:
+                headers["Authorization"] = f"Bearer {self.token}"
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                headers=headers,
+                limits=httpx.Limits(
+                    max_connections=GITHUB_MAX_CONNECTIONS,
+                    max_keepalive_connections=GITHUB_MAX_CONNECTIONS,
+                    keepalive_expiry=GITHUB_KEEPALIVE_EXPIRY,
+                ),
+                timeout=httpx.Timeout(GITHUB_TIMEOUT),
+            )
+        return self._client
+
+    async def close(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _record_rate_limit(self, response: httpx.Response) -> None:
+        remaining = response.headers.get("x-ratelimit-remaining")
+        reset = response.headers.get("x-ratelimit-reset")
+        if remaining is not None and remaining.isdigit():
+            self.rate_limit_remaining = int(remaining)
+        if reset is not None and reset.isdigit():
+            self.rate_limit_reset = float(reset)
+
+    def _rate_limit_wait(self) -> float:
+        """Seconds until the known rate limit resets, or 0 if requests may be sent."""
+        if self.rate_limit_remaining != 0 or self.rate_limit_reset is None:
+            return 0.0
+        wait = self.rate_limit_reset - time.time()
+        if wait <= 0:
+            self.rate_limit_remaining = None
+            return 0.0
+        return wait
+
+    async def _back_off(self, wait: float, cached: CachedResponse | None) -> GitHubPage | None:
+        """Sleep through a short rate-limit wait; serve stale or raise on a long one."""
+        if wait > self.max_backoff:
+            if cached is not None:
+                self.counts["stale_hits"] += 1
+                return GitHubPage(cached.body, cached.link, "stale")
+            raise GitHubRateLimited(wait)
+        self.counts["rate_limit_waits"] += 1
+        await asyncio.sleep(wait)
+        return None
+
+    async def _retry_delay(self, attempt: int) -> None:
+        # Exponential backoff between attempts; none after the last one
+        if attempt < self.max_retries:
+            await asyncio.sleep(GITHUB_RETRY_BASE_SECONDS * 2**attempt)
+
+    async def get_page(self, path: str, params: dict | None = None) -> GitHubPage:
+        """
+        GET a JSON resource, through the ETag cache.
+
+        Raises:
+            GitHubNotFound: On a 404
+            GitHubRateLimited: If rate limited with no cached response to fall back on
+            GitHubError: On any other failure once retries are exhausted
+        """
+        url = f"{path}?{urlencode(sorted(params.items()))}" if params else path
+        cached = await asyncio.to_thread(self.cache.get, url) if self.cache is not None else None
+        if cached is not None and cached.fresh_until > time.time():
+            self.counts["fresh_hits"] += 1
+            return GitHubPage(cached.body, cached.link, "fresh")
+
+        headers = {}
+        if cached is not None and cached.etag:
+            headers["If-None-Match"] = cached.etag
+
+        for attempt in range(self.max_retries + 1):
+            wait = self._rate_limit_wait()
+            if wait:
+                page = await self._back_off(wait, cached)
+                if page is not None:
+                    return page
+
+            if attempt:
+                self.counts["retries"] += 1
+            try:
+                self.counts["requests"] += 1
+                response = await self._get_client().get(url, headers=headers)
+            except httpx.HTTPError as e:
+                error = f"{type(e).__name__}: {e}"
+                await self._retry_delay(attempt)
+                continue
+            self._record_rate_limit(response)
+            fresh_until = time.time() + _max_age(response)
+
+            if response.status_code == 304 and cached is not None:
+                self.counts["not_modified"] += 1
+                await asyncio.to_thread(self.cache.refresh, url, fresh_until)
+                return GitHubPage(cached.body, cached.link, "not_modified")
+            if response.status_code == 200:
+                try:
+                    body = response.json()
+                except ValueError:
+                    # e.g. a proxy or captive-portal page served with a 200
+                    raise GitHubError(f"non-JSON response for {path}") from None
+                link = response.headers.get("link")
+                if self.cache is not None:
+                    await asyncio.to_thread(
+                        self.cache.put, url, response.headers.get("etag"), body, link, fresh_until
+                    )
+                return GitHubPage(body, link, "network")
+            if response.status_code == 404:
+                raise GitHubNotFound(f"{path} not found")
+
+            error = f"HTTP {response.status_code}"
+            retry_after = _retry_after(response)
+            if response.status_code in (403, 429) and (
+                retry_after is not None or self.rate_limit_remaining == 0
+            ):
+                wait = retry_after if retry_after is not None else self._rate_limit_wait()
+                # A reset already in the past means clock skew; still pause before retrying
+                page = await self._back_off(
+                    max(wait, GITHUB_RETRY_BASE_SECONDS * 2**attempt), cached
+                )
+                if page is not None:
+                    return page
+                continue
+            if response.status_code < 500:
+                raise GitHubError(f"{error} for {path}")
+            await self._retry_delay(attempt)
+
+        if cached is not None:
+            self.counts["stale_hits"] += 1
+            return GitHubPage(cached.body, cached.link, "stale")
+        raise GitHubError(f"{error} for {path} after {self.max_retries + 1} attempts")
+
+    async def get_all_pages(
+        self, path: str, params: dict | None = None, max_pages: int = GITHUB_MAX_PAGES
+    ) -> tuple[list, bool]:
+        """
+        Every item of a paginated listing: the first page, then the rest concurrently.
+
+        Returns:
+            (items, truncated); truncated is True when the listing had more
+            than max_pages pages and the rest were not fetched
+
+        Raises:
+            GitHubError: As get_page, or if a page is not a JSON list
+        """
+        params = {**(params or {}), "per_page": GITHUB_PER_PAGE}
+        first = await self.get_page(path, params)
+        last_page = min(first.last_page, max_pages)
+        rest = await asyncio.gather(
+            *(self.get_page(path, {**params, "page": page}) for page in range(2, last_page + 1))
+        )
+        items = []
+        for page in (first, *rest):
+            if not isinstance(page.body, list):
+                raise GitHubError(f"expected a list from {path}, got {type(page.body).__name__}")
+            items.extend(page.body)
+        return items, first.last_page > max_pages
+
+    async def user_repos(self, username: str) -> tuple[list[dict], bool]:
+        """(repos, truncated) for a user; see get_all_pages."""
+        return await self.get_all_pages(f"/users/{quote(username, safe='')}/repos")
+
+    def stats(self) -> dict:
+        return {
+            **self.counts,
+            "authenticated": self.token is not None,
+            "rate_limit_remaining": self.rate_limit_remaining,
+            "rate_limit_reset": self.rate_limit_reset,
+            "cache_entries": self.cache.entries() if self.cache is not None else None,
+        }
+
+
+github_client = GitHubClient(cache=GitHubCache(GITHUB_CACHE_PATH) if GITHUB_CACHE_ENABLED else None)
@@ -0,0 +1,149 @@
+"""
+In-process background job queue.
+
+Jobs are coroutine factories executed by a fixed pool of asyncio workers, so
+the pool size is the single cap on how much evaluation work runs at once.
+Work that is already running elsewhere can be tracked as a job too, without
+taking a worker. Finished jobs are kept for JOB_RETENTION_SECONDS so clients
+can poll them.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import os
+import time
+import uuid
+from typing import Any, Awaitable, Callable
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_RETENTION_SECONDS = 3600
+# How long shutdown waits for tracked jobs before cancelling them
+TRACKED_SHUTDOWN_SECONDS = 5.0
+MAX_LONG_POLL_SECONDS = 30.0
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+
+class Job:
+    def __init__(self, fn: Callable[[], Awaitable[Any]]) -> None:
+        self.job_id = uuid.uuid4().hex
+        self.status = STATUS_QUEUED
+        self.result: Any = None
+        self.error: str | None = None
+        self.created_at = time.time()
+        self.finished_at: float | None = None
+        self._fn = fn
+        self._finished = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self._finished.is_set()
+
+
+class JobQueue:
+    def __init__(self, workers: int = JOB_WORKERS) -> None:
+        self.workers = workers
+        self._jobs: dict[str, Job] = {}
+        self._queue: asyncio.Queue[Job] | None = None
+        self._tasks: list[asyncio.Task] = []
+        self._tracked: set[asyncio.Task] = set()
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._queue = asyncio.Queue()
+        self._tasks = [
+            asyncio.create_task(self._worker()) for _ in range(self.workers)
+        ]
+
+    async def stop(self) -> None:
+        if self._tracked:
+            await asyncio.wait(self._tracked, timeout=TRACKED_SHUTDOWN_SECONDS)
+        for task in [*self._tasks, *self._tracked]:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def submit(self, fn: Callable[[], Awaitable[Any]]) -> Job:
+        if self._queue is None:
+            raise RuntimeError("Job queue has not been started")
+        self._prune()
+        job = Job(fn)
+        self._jobs[job.job_id] = job
+        self._queue.put_nowait(job)
+        return job
+
+    def track(self, fn: Callable[[], Awaitable[Any]]) -> Job:
+        """
+        Register a job that runs right away in its own task instead of on a
+        worker, for coroutines that mostly wait on work already in flight.
+        """
+        self._prune()
+        job = Job(fn)
+        self._jobs[job.job_id] = job
+        task = asyncio.create_task(self._run(job))
+        self._tracked.add(task)
+        task.add_done_callback(self._tracked.discard)
+        return job
+
+    def get(self, job_id: str) -> Job | None:
+        return self._jobs.get(job_id)
+
+    async def wait(self, job: Job, timeout: float) -> Job:
+        """Long-poll: return once the job finishes or `timeout` seconds pass."""
+        timeout = min(max(timeout, 0.0), MAX_LONG_POLL_SECONDS)
+        if timeout and not job.finished:
+            try:
+                await asyncio.wait_for(job._finished.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return job
+
+    def stats(self) -> dict:
+        counts: dict[str, int] = {}
+        for job in self._jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "workers": self.workers,
+            "queued": self._queue.qsize() if self._queue else 0,
+            "jobs": counts,
+        }
+
+    async def _worker(self) -> None:
+        assert self._queue is not None
+        while True:
+            job = await self._queue.get()
+            try:
+                await self._run(job)
+            finally:
+                self._queue.task_done()
+
+    async def _run(self, job: Job) -> None:
+        job.status = STATUS_RUNNING
+        try:
+            job.result = await job._fn()
+            job.status = STATUS_DONE
+        except Exception as e:
+            print(f"Job {job.job_id} failed: {e}")
+            job.error = str(e)
+            job.status = STATUS_FAILED
+        finally:
+            job.finished_at = time.time()
+            job._finished.set()
+
+    def _prune(self) -> None:
+        cutoff = time.time() - JOB_RETENTION_SECONDS
+        expired = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.finished_at is not None and job.finished_at < cutoff
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+job_queue = JobQueue()
@@ -0,0 +1,155 @@
+"""
+Persistent, content-addressed cache for LLM responses.
+
+Entries are keyed by a SHA-256 of model + prompt + options and stored in a
+SQLite file next to the user data. The cache is bounded by entry count (least
+recently used rows are evicted first) and by age (TTL). Entries are dropped
+wholesale for a model when its tag starts pointing at a different digest.
+
+Connection handling, LRU eviction and last_access touches come from
+SQLiteCache. Every method does blocking SQLite I/O; async callers go through
+asyncio.to_thread.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+
+from app.services.sqlite_cache import SQLiteCache
+
+CACHE_PATH = Path(__file__).resolve().parent.parent / "data" / "llm_cache.sqlite3"
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") != "0"
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+LLM_CACHE_TTL_SECONDS = int(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+# A hit only rewrites last_access once it is this stale; LRU order needs no more
+LLM_CACHE_TOUCH_INTERVAL_SECONDS = int(os.getenv("LLM_CACHE_TOUCH_INTERVAL_SECONDS", "600"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    model TEXT NOT NULL,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access);
+CREATE TABLE IF NOT EXISTS model_digests (
+    model TEXT PRIMARY KEY,
+    digest TEXT NOT NULL
+);
+"""
+
+
+def cache_key(model: str, prompt: str, options: dict | None = None, **extra) -> str:
+    payload = {"model": model, "prompt": prompt, "options": options or {}}
+    payload.update({name: value for name, value in extra.items() if value is not None})
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(encoded.encode("utf-8")).hexdigest()
+
+
+class LLMCache(SQLiteCache):
+    def __init__(
+        self,
+        path: Path,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        ttl_seconds: int = LLM_CACHE_TTL_SECONDS,
+    ) -> None:
+        super().__init__(path, _SCHEMA, "responses", "key", LLM_CACHE_TOUCH_INTERVAL_SECONDS)
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> str | None:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT response, created_at, last_access FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            response, created_at, last_access = row
+            if now - created_at > self.ttl_seconds:
+                conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                conn.commit()
+                self.evictions += 1
+                self.misses += 1
+                return None
+            self._touch(conn, key, last_access, now)
+            self.hits += 1
+            return response
+
+    def put(self, key: str, model: str, response: str) -> None:
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, model, response, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, model, response, now, now),
+            )
+            expired = conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - self.ttl_seconds,)
+            ).rowcount
+            evicted = self._evict_lru(conn, self.max_entries)
+            conn.commit()
+            self.evictions += expired + evicted
+
+    def invalidate(self, model: str | None = None) -> int:
+        """Drop every entry, or only the entries for one model. Returns rows removed."""
+        with self._lock:
+            conn = self._connection()
+            if model is None:
+                removed = conn.execute("DELETE FROM responses").rowcount
+            else:
+                removed = conn.execute(
+                    "DELETE FROM responses WHERE model = ?", (model,)
+                ).rowcount
+            conn.commit()
+            return removed
+
+    def sync_model_digest(self, model: str, digest: str) -> bool:
+        """
+        Record the digest a model tag currently resolves to.
+
+        Returns True (after purging that model's entries) when the tag moved
+        to a different digest since the last sync.
+        """
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT digest FROM model_digests WHERE model = ?", (model,)
+            ).fetchone()
+            changed = row is not None and row[0] != digest
+            if changed:
+                conn.execute("DELETE FROM responses WHERE model = ?", (model,))
+            conn.execute(
+                "INSERT OR REPLACE INTO model_digests (model, digest) VALUES (?, ?)",
+                (model, digest),
+            )
+            conn.commit()
+            return changed
+
+    def stats(self) -> dict:
+        entries = self._count()
+        lookups = self.hits + self.misses
+        return {
+            "enabled": LLM_CACHE_ENABLED,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+llm_cache = LLMCache(CACHE_PATH)
@@ -0,0 +1,338 @@
+"""
+Shared async Ollama client.
+
+A single pooled httpx.AsyncClient is reused by every engine, so LLM calls keep
+their connections alive and never pin a threadpool worker while waiting.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable
+
+import httpx
+
+from app.services.circuit_breaker import CircuitBreaker
+from app.services.llm_cache import LLM_CACHE_ENABLED, cache_key, llm_cache
+
+OLLAMA_BASE_URL = os.getenv("OLLAMA_BASE_URL", "http://127.0.0.1:11434")
+OLLAMA_MAX_CONNECTIONS = int(os.getenv("OLLAMA_MAX_CONNECTIONS", "8"))
+OLLAMA_MAX_KEEPALIVE = int(os.getenv("OLLAMA_MAX_KEEPALIVE", "8"))
+OLLAMA_KEEPALIVE_EXPIRY = 60.0
+OLLAMA_CONNECT_TIMEOUT = 5.0
+DEFAULT_TIMEOUT = 120.0
+# How long Ollama keeps a model resident after each request
+OLLAMA_KEEP_ALIVE = os.getenv("OLLAMA_KEEP_ALIVE", "1h")
+WARM_UP_TIMEOUT = 300.0
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+
+# Lower values are served first
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 10
+
+_client: httpx.AsyncClient | None = None
+
+
+class PriorityLimiter:
+    """
+    Concurrency limiter whose waiters are admitted in priority order.
+
+    Equal priorities are served first come, first served.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self.active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future]] = []
+        self._seq = itertools.count()
+
+    @property
+    def waiting(self) -> int:
+        return sum(1 for _, _, fut in self._waiters if not fut.done())
+
+    async def acquire(self, priority: int = PRIORITY_INTERACTIVE) -> None:
+        if self.active < self.limit and not self.waiting:
+            self.active += 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), fut))
+        try:
+            await fut
+        except asyncio.CancelledError:
+            # The slot was handed over just before cancellation; pass it on
+            if fut.done() and not fut.cancelled():
+                self.release()
+            raise
+
+    def release(self) -> None:
+        while self._waiters:
+            _, _, fut = heapq.heappop(self._waiters)
+            if not fut.done():
+                # Hand the slot straight to the next waiter
+                fut.set_result(None)
+                return
+        self.active -= 1
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_INTERACTIVE):
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+limiter = PriorityLimiter(LLM_MAX_CONCURRENCY)
+breaker = CircuitBreaker("ollama")
+
+
+@asynccontextmanager
+async def _guarded_call(priority: int, use_breaker: bool = True):
+    """
+    Admit a call through the circuit breaker and the concurrency limiter.
+
+    Transport errors and latency are reported to the breaker; latency is
+    measured from when a slot is granted, not while queued. Calls made with
+    use_breaker=False only go through the limiter and are not recorded.
+    """
+    if not use_breaker:
+        async with limiter.slot(priority):
+            yield
+        return
+
+    breaker.before_call()
+    start = None
+    try:
+        async with limiter.slot(priority):
+            start = time.monotonic()
+            yield
+    except httpx.HTTPError:
+        breaker.record_failure(time.monotonic() - (start or time.monotonic()))
+        raise
+    except BaseException:
+        breaker.record_abandoned()
+        raise
+    breaker.record_success(time.monotonic() - start)
+
+
+def get_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            base_url=OLLAMA_BASE_URL,
+            limits=httpx.Limits(
+                max_connections=OLLAMA_MAX_CONNECTIONS,
+                max_keepalive_connections=OLLAMA_MAX_KEEPALIVE,
+                keepalive_expiry=OLLAMA_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(DEFAULT_TIMEOUT, connect=OLLAMA_CONNECT_TIMEOUT),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def generate(
+    model: str,
+    prompt: str,
+    options: dict | None = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    parse: Callable[[str], Any] | None = None,
+    use_cache: bool = True,
+    priority: int = PRIORITY_INTERACTIVE,
+    system: str | None = None,
+    use_breaker: bool = True,
+    deadline: float | None = None,
+) -> Any:
+    """
+    Run a non-streaming Ollama generation, served from the response cache when possible.
+
+    Args:
+        model: Ollama model tag
+        prompt: Per-call prompt text
+        options: Ollama sampling options
+        timeout: Per-call timeout in seconds (also bounds the wait for a pooled connection)
+        parse: Optional parser applied to the response text; a response is only
+            cached once it parses, so malformed generations are retried next time
+        use_cache: Set to False to bypass the cache entirely
+        priority: Queue priority for a concurrency slot (PRIORITY_INTERACTIVE
+            is admitted ahead of PRIORITY_BATCH)
+        system: Static instruction prefix. Keeping it identical across calls
+            lets Ollama reuse its already-evaluated tokens
+        use_breaker: Set to False for offline batch work, which should neither
+            be rejected by nor trip the interactive circuit breaker
+        deadline: time.monotonic() by which the call must finish. The request
+            timeout is cut to what is left once a slot is granted, so a miss
+            surfaces as httpx.TimeoutException and counts against the breaker
+
+    Returns:
+        The stripped "response" field, or parse(response) when a parser is given
+
+    Raises:
+        httpx.HTTPError: On transport errors, timeouts or non-2xx responses
+        CircuitOpenError: When the circuit breaker is rejecting calls
+        asyncio.TimeoutError: When the deadline passed while queued for a slot
+    """
+    use_cache = use_cache and LLM_CACHE_ENABLED
+    key = cache_key(model, prompt, options, system=system) if use_cache else None
+    if key is not None:
+        cached = await asyncio.to_thread(llm_cache.get, key)
+        if cached is not None:
+            return parse(cached) if parse else cached
+
+    async with _guarded_call(priority, use_breaker):
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+            if timeout <= 0:
+                # Never reached Ollama, so the breaker records no outcome
+                raise asyncio.TimeoutError
+        text = await _post_generate(model, prompt, options, timeout, system)
+    result = parse(text) if parse else text
+    if key is not None:
+        await asyncio.to_thread(llm_cache.put, key, model, text)
+    return result
+
+
+def _payload(
+    model: str, prompt: str, options: dict | None, system: str | None, stream: bool
+) -> dict:
+    payload = {
+        "model": model,
+        "prompt": prompt,
+        "stream": stream,
+        "options": options or {},
+        "keep_alive": OLLAMA_KEEP_ALIVE,
+    }
+    if system is not None:
+        payload["system"] = system
+    return payload
+
+
+async def _post_generate(
+    model: str,
+    prompt: str,
+    options: dict | None,
+    timeout: float,
+    system: str | None = None,
+) -> str:
+    resp = await get_client().post(
+        "/api/generate",
+        json=_payload(model, prompt, options, system, stream=False),
+        timeout=httpx.Timeout(timeout, connect=OLLAMA_CONNECT_TIMEOUT),
+    )
+    resp.raise_for_status()
+    return str(resp.json().get("response", "")).strip()
+
+
+async def stream_generate(
+    model: str,
+    prompt: str,
+    options: dict | None = None,
+    timeout: float = DEFAULT_TIMEOUT,
+    parse: Callable[[str], Any] | None = None,
+    use_cache: bool = True,
+    priority: int = PRIORITY_INTERACTIVE,
+    system: str | None = None,
+) -> AsyncIterator[str]:
+    """
+    Stream an Ollama generation token by token.
+
+    A cached response is replayed as a single chunk. A freshly streamed
+    response is cached once complete, provided `parse` (if given) accepts it.
+    """
+    use_cache = use_cache and LLM_CACHE_ENABLED
+    key = cache_key(model, prompt, options, system=system) if use_cache else None
+    if key is not None:
+        cached = await asyncio.to_thread(llm_cache.get, key)
+        if cached is not None:
+            yield cached
+            return
+
+    chunks = []
+    async with _guarded_call(priority), get_client().stream(
+        "POST",
+        "/api/generate",
+        json=_payload(model, prompt, options, system, stream=True),
+        timeout=httpx.Timeout(timeout, connect=OLLAMA_CONNECT_TIMEOUT),
+    ) as resp:
+        resp.raise_for_status()
+        async for line in resp.aiter_lines():
+            if not line.strip():
+                continue
+            data = json.loads(line)
+            token = data.get("response", "")
+            if token:
+                chunks.append(token)
+                yield token
+            if data.get("done"):
+                break
+
+    if key is None:
+        return
+    text = "".join(chunks).strip()
+    try:
+        if parse:
+            parse(text)
+    except Exception:
+        return
+    await asyncio.to_thread(llm_cache.put, key, model, text)
+
+
+async def warm_up(prefixes: list[tuple[str, str | None]]) -> dict[str, float]:
+    """
+    Load each model and pre-evaluate its static system prompt.
+
+    Sends a one-token generation per (model, system) pair so the model is
+    resident (held for OLLAMA_KEEP_ALIVE) and the shared prefix is already in
+    Ollama's prompt cache when the first real request arrives. Bypasses the
+    circuit breaker and the response cache.
+
+    Returns:
+        Seconds taken per model/prefix, keyed by model name
+    """
+    timings = {}
+    for model, system in prefixes:
+        start = time.monotonic()
+        resp = await get_client().post(
+            "/api/generate",
+            json=_payload(model, "Ready?", {"num_predict": 1}, system, stream=False),
+            timeout=httpx.Timeout(WARM_UP_TIMEOUT, connect=OLLAMA_CONNECT_TIMEOUT),
+        )
+        resp.raise_for_status()
+        timings[model] = round(time.monotonic() - start, 3)
+    return timings
+
+
+async def refresh_model_digests(timeout: float = 5.0) -> list[str]:
+    """
+    Sync cached model digests with the Ollama server.
+
+    Purges cached responses for any model tag that now resolves to a different
+    digest (e.g. after `ollama pull`). Returns the models that were invalidated.
+    """
+    resp = await get_client().get("/api/tags", timeout=timeout)
+    resp.raise_for_status()
+    invalidated = []
+    for entry in resp.json().get("models", []):
+        digest = entry.get("digest")
+        if not digest:
+            continue
+        names = {name for name in (entry.get("name"), entry.get("model")) if name}
+        # "llama3" and "llama3:latest" refer to the same model
+        names |= {name.removesuffix(":latest") for name in names}
+        for name in sorted(names):
+            if llm_cache.sync_model_digest(name, digest):
+                invalidated.append(name)
+    return invalidated
@@ -0,0 +1,127 @@
+"""
+Market data provider with hot reload.
+
+app/data/market_skills.json is loaded into an immutable snapshot
+(the raw role -> skill frequencies plus the role indexes, per-role analysis
+payloads and skill matcher built from them). A background thread polls the file's mtime and,
+when it changes, builds the next snapshot off the request path and swaps it
+in with a single reference assignment. Callers take one snapshot per request via current() and use it
+throughout, so a reload never mixes two versions within a request.
+
+A snapshot's version is a digest of the file's bytes, so every worker
+process (and every restart) reports the same version for the same file.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+
+from app.services.role_index import InvertedRoleIndex, RoleIndex
+from app.services.role_profiles import build_role_profiles
+from app.services.skill_matcher import SkillMatcher
+
+MARKET_DATA_PATH = Path(__file__).resolve().parent.parent / "data" / "market_skills.json"
+MARKET_DATA_POLL_SECONDS = float(os.getenv("MARKET_DATA_POLL_SECONDS", "5"))
+
+
+class MarketSnapshot:
+    def __init__(self, version: str, data: dict[str, dict[str, float]], mtime: float | None) -> None:
+        self.version = version
+        self.data = data
+        self.mtime = mtime
+        self.loaded_at = time.time()
+        self.index = RoleIndex(data)
+        self.inverted_index = InvertedRoleIndex(self.index)
+        self.skill_matcher = SkillMatcher(self.index.vocabulary)
+        self.profiles = build_role_profiles(data)
+
+
+def _read_market_data(path: Path) -> tuple[dict, float | None, str]:
+    """Return (data, mtime, version) for the file; a missing file is empty data."""
+    if not path.exists():
+        raw, mtime = b"{}", None
+    else:
+        mtime = path.stat().st_mtime
+        raw = path.read_bytes()
+    version = hashlib.sha256(raw).hexdigest()[:16]
+    return json.loads(raw), mtime, version
+
+
+class MarketDataProvider:
+    def __init__(self, path: Path = MARKET_DATA_PATH) -> None:
+        self.path = path
+        data, mtime, version = _read_market_data(path)
+        self._snapshot = MarketSnapshot(version, data, mtime)
+        # mtime of the last file read, so an unchanged touch is read only once
+        self._seen_mtime = mtime
+        self._reload_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def current(self) -> MarketSnapshot:
+        return self._snapshot
+
+    def reload(self, force: bool = False) -> bool:
+        """
+        Load the file into a new snapshot if it changed since the current one.
+
+        Returns True if a new snapshot was swapped in. A file that fails to
+        parse (e.g. caught mid-write) leaves the current snapshot in place.
+        """
+        with self._reload_lock:
+            current = self._snapshot
+            try:
+                mtime = self.path.stat().st_mtime
+            except FileNotFoundError:
+                return False
+            if not force and mtime == self._seen_mtime:
+                return False
+            try:
+                data, mtime, version = _read_market_data(self.path)
+                self._seen_mtime = mtime
+                if not force and version == current.version:
+                    return False
+                snapshot = MarketSnapshot(version, data, mtime)
+            except (OSError, ValueError) as e:
+                print(f"Market data reload failed, keeping version {current.version}: {e}")
+                return False
+            self._snapshot = snapshot
+            print(f"Market data reloaded: version {snapshot.version}, {len(data)} roles")
+            return True
+
+    def start_watching(self, interval: float = MARKET_DATA_POLL_SECONDS) -> None:
+        if self._thread is not None or interval <= 0:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._watch, args=(interval,), name="market-data-watcher", daemon=True
+        )
+        self._thread.start()
+
+    def stop_watching(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _watch(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            self.reload()
+
+    def stats(self) -> dict:
+        snapshot = self._snapshot
+        return {
+            "version": snapshot.version,
+            "roles": len(snapshot.data),
+            "skills": len(snapshot.index.vocabulary),
+            "loaded_at": snapshot.loaded_at,
+            "watching": self._thread is not None,
+        }
+
+
+market_data = MarketDataProvider()
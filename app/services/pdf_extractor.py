@@ -0,0 +1,170 @@
+"""
+Resume PDF text extraction in bounded, isolated worker processes.
+
+Each extraction runs in its own short-lived process (started from a
+forkserver that has pdfplumber preloaded, so start-up is cheap). At most
+PDF_MAX_WORKERS run at once, and each one:
+
+- reads at most PDF_MAX_PAGES pages, and stops early once PDF_ENOUGH_TEXT_CHARS
+  characters have been read, which is plenty to classify a resume
+- is killed after PDF_TIMEOUT_SECONDS of wall-clock time; the pages read so
+  far are still used
+- runs under an address-space limit of PDF_MEMORY_LIMIT_MB (where the
+  platform supports RLIMIT_AS), so a hostile PDF cannot exhaust the server
+
+Pages are streamed back to the parent as they are extracted. Async callers
+run extractions on extraction_executor, whose PDF_MAX_WORKERS threads are the
+only ones that ever wait for a worker slot, so a burst of uploads cannot tie
+up the event loop's default executor.
+"""
+
+from __future__ import annotations
+
+import io
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+PDF_MAX_WORKERS = int(os.getenv("PDF_MAX_WORKERS", "2"))
+PDF_MAX_PAGES = int(os.getenv("PDF_MAX_PAGES", "20"))
+PDF_TIMEOUT_SECONDS = float(os.getenv("PDF_TIMEOUT_SECONDS", "15"))
+PDF_MEMORY_LIMIT_MB = int(os.getenv("PDF_MEMORY_LIMIT_MB", "512"))
+PDF_ENOUGH_TEXT_CHARS = int(os.getenv("PDF_ENOUGH_TEXT_CHARS", "20000"))
+
+if "forkserver" in multiprocessing.get_all_start_methods():
+    _context = multiprocessing.get_context("forkserver")
+    _context.set_forkserver_preload(["pdfplumber"])
+else:
+    _context = multiprocessing.get_context("spawn")
+
+_slots = threading.BoundedSemaphore(PDF_MAX_WORKERS)
+extraction_executor = ThreadPoolExecutor(max_workers=PDF_MAX_WORKERS, thread_name_prefix="pdf")
+
+
+class PdfExtractionError(Exception):
+    """Raised when no text could be extracted from a PDF."""
+
+
+class PdfExtraction:
+    def __init__(self, text: str, pages_read: int, complete: bool, reason: str) -> None:
+        self.text = text
+        self.pages_read = pages_read
+        # False when pages were skipped: page limit, early stop, timeout or crash
+        self.complete = complete
+        self.reason = reason
+
+
+def _limit_memory(limit_mb: int) -> None:
+    try:
+        import resource
+    except ImportError:
+        return
+    limit = limit_mb * 1024 * 1024
+    try:
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    except (ValueError, OSError):
+        pass
+
+
+def _extract_pages(
+    conn, resume_bytes: bytes, max_pages: int, enough_chars: int, memory_limit_mb: int
+) -> None:
+    """Worker process entry point: send ("page", text) per page, then ("done", reason)."""
+    _limit_memory(memory_limit_mb)
+    try:
+        import pdfplumber
+
+        with pdfplumber.open(io.BytesIO(resume_bytes)) as pdf:
+            total_pages = len(pdf.pages)
+            chars = 0
+            reason = "complete"
+            for page_number, page in enumerate(pdf.pages):
+                if page_number >= max_pages:
+                    reason = "page_limit"
+                    break
+                text = page.extract_text() or ""
+                conn.send(("page", text))
+                chars += len(text)
+                if chars >= enough_chars and page_number + 1 < total_pages:
+                    reason = "enough_text"
+                    break
+                # Release the page's parsed objects before reading the next one
+                page.close()
+        conn.send(("done", reason))
+    except BaseException as e:
+        try:
+            conn.send(("error", f"{type(e).__name__}: {e}"))
+        except OSError:
+            pass
+    finally:
+        conn.close()
+
+
+def extract_resume_text(
+    resume_bytes: bytes,
+    max_pages: int = PDF_MAX_PAGES,
+    timeout: float = PDF_TIMEOUT_SECONDS,
+) -> PdfExtraction:
+    """
+    Extract lower-cased text from a PDF in a worker process.
+
+    Blocks the calling thread (not the worker) while waiting for a free
+    worker slot and for the extraction itself; from async code, call it on
+    extraction_executor.
+
+    Raises:
+        PdfExtractionError: If the PDF could not be read at all
+    """
+    with _slots:
+        receiver, sender = _context.Pipe(duplex=False)
+        process = _context.Process(
+            target=_extract_pages,
+            args=(sender, resume_bytes, max_pages, PDF_ENOUGH_TEXT_CHARS, PDF_MEMORY_LIMIT_MB),
+            daemon=True,
+        )
+        process.start()
+        sender.close()
+
+        pages: list[str] = []
+        reason = "timeout"
+        error = None
+        deadline = time.monotonic() + timeout
+        try:
+            while True:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not receiver.poll(remaining):
+                    break
+                try:
+                    kind, value = receiver.recv()
+                except EOFError:
+                    # The worker died without reporting, e.g. killed by the memory limit
+                    reason, error = "crashed", "worker exited unexpectedly"
+                    break
+                if kind == "page":
+                    pages.append(value)
+                elif kind == "done":
+                    reason = value
+                    break
+                else:
+                    reason, error = "error", value
+                    break
+        finally:
+            receiver.close()
+            if process.is_alive():
+                process.kill()
+            process.join()
+
+    if reason not in ("complete", "page_limit", "enough_text"):
+        print(f"PDF extraction stopped after {len(pages)} pages: {reason} {error or ''}".rstrip())
+        if not pages:
+            raise PdfExtractionError(error or reason)
+
+    return PdfExtraction(
+        text="\n".join(pages).lower(),
+        pages_read=len(pages),
+        complete=reason == "complete",
+        reason=reason,
+    )
+
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
-import io
+import asyncio
+import os
 import re
+import threading
 from collections import Counter
 
-import pdfplumber
-import requests
+from app.services.github_client import GitHubError, github_client
+from app.services.market_data import MarketSnapshot, market_data
+from app.services.pdf_extractor import extract_resume_text, extraction_executor
+from app.services.resume_cache import resume_cache, resume_digest
+from app.services.skill_extractor import SkillExtractor, build_patterns
+from app.services.skill_normalization import SKILL_NORMALIZATIONS
 
 TECHNICAL_KEYWORDS = [
     "python",
@@ -31,17 +37,103 @@ SOFT_KEYWORDS = [
     "adaptability",
 ]
 
+# Extractions worth caching; timed-out or crashed ones may do better next time
+CACHEABLE_EXTRACTIONS = ("complete", "page_limit", "enough_text")
+
+# Each side of analyze_profile gets its own deadline; the resume one sits
+# above PDF_TIMEOUT_SECONDS so a slow PDF still yields its first pages
+PROFILE_RESUME_DEADLINE_SECONDS = float(os.getenv("PROFILE_RESUME_DEADLINE_SECONDS", "20"))
+PROFILE_GITHUB_DEADLINE_SECONDS = float(os.getenv("PROFILE_GITHUB_DEADLINE_SECONDS", "8"))
+
 YEARS_PATTERN = re.compile(r"\b([2-9]\d*)\s*\+?\s*(years|yrs)\b")
 
 
-def _extract_resume_text(resume_bytes: bytes) -> str:
-    with pdfplumber.open(io.BytesIO(resume_bytes)) as pdf:
-        pages = [page.extract_text() or "" for page in pdf.pages]
-    return "\n".join(pages).lower()
+# Market skills that are also plain English ("the rest of", "i excel at",
+# "an api of"). In free text they only count through an unambiguous alias
+# ("restful", "ms excel"); bare, they count only inside a skill list.
+# TECHNICAL_KEYWORDS always stay in the free-text extractor.
+AMBIGUOUS_SKILLS = frozenset({"api", "excel", "rest"}) - set(TECHNICAL_KEYWORDS)
+
+# A skill list is either one line of at least SKILL_LIST_MIN_ITEMS short
+# items separated by commas, pipes, bullets or slashes (after an optional
+# "label:" prefix), or a run of at least SKILL_LIST_MIN_ITEMS consecutive
+# bulleted lines holding one short item each
+SKILL_LIST_SEPARATOR = re.compile(r"[,|/;\u2022\u00b7]")
+SKILL_LIST_BULLET = re.compile(r"^\s*(?:[-*+\u2022\u00b7]|\d+[.)])\s+(\S.*)$")
+SKILL_LIST_MIN_ITEMS = 3
+SKILL_LIST_MAX_ITEM_WORDS = 3
+
+
+SOFT_SKILL_EXTRACTOR = SkillExtractor(build_patterns(SOFT_KEYWORDS))
+
+_technical_extractors_lock = threading.Lock()
+_technical_extractors: tuple[str, SkillExtractor, SkillExtractor] | None = None
+
+
+def technical_skill_extractors(
+    snapshot: MarketSnapshot | None = None,
+) -> tuple[SkillExtractor, SkillExtractor]:
+    """
+    Extractors over TECHNICAL_KEYWORDS, every market skill and the skill
+    aliases, rebuilt only when the market data version changes.
+
+    Returns:
+        (free-text extractor without the bare AMBIGUOUS_SKILLS,
+        extractor for the bare AMBIGUOUS_SKILLS, to run on skill lists only)
+    """
+    global _technical_extractors
+    snapshot = snapshot or market_data.current()
+    cached = _technical_extractors
+    if cached is not None and cached[0] == snapshot.version:
+        return cached[1], cached[2]
+    with _technical_extractors_lock:
+        if _technical_extractors is None or _technical_extractors[0] != snapshot.version:
+            keywords = [*TECHNICAL_KEYWORDS, *snapshot.index.vocabulary]
+            patterns = build_patterns(keywords, SKILL_NORMALIZATIONS)
+            free_text = {p: c for p, c in patterns.items() if p not in AMBIGUOUS_SKILLS}
+            ambiguous = {p: c for p, c in patterns.items() if p in AMBIGUOUS_SKILLS}
+            _technical_extractors = (
+                snapshot.version,
+                SkillExtractor(free_text),
+                SkillExtractor(ambiguous),
+            )
+        return _technical_extractors[1], _technical_extractors[2]
+
 
+def _is_skill_item(item: str) -> bool:
+    return bool(item.strip()) and len(item.split()) <= SKILL_LIST_MAX_ITEM_WORDS
 
-def _detect_keywords(text: str, keywords: list[str]) -> list[str]:
-    return [keyword for keyword in keywords if keyword in text]
+
+def _skill_list_text(text: str) -> str:
+    """The lines of text that read as skill lists, e.g. "skills: python, react, rest"."""
+    lines = []
+    bullets: list[str] = []
+    for line in text.splitlines():
+        bullet = SKILL_LIST_BULLET.match(line)
+        if bullet and _is_skill_item(bullet.group(1)):
+            bullets.append(line)
+            continue
+        if len(bullets) >= SKILL_LIST_MIN_ITEMS:
+            lines += bullets
+        bullets = []
+
+        # Drop a "label:" prefix, then split into items
+        items = SKILL_LIST_SEPARATOR.split(line.rpartition(":")[2])
+        items = [item for item in items if item.strip()]
+        if len(items) >= SKILL_LIST_MIN_ITEMS and all(_is_skill_item(item) for item in items):
+            lines.append(line)
+    if len(bullets) >= SKILL_LIST_MIN_ITEMS:
+        lines += bullets
+    return "\n".join(lines)
+
+
+def _extract_technical_skills(text: str) -> list[str]:
+    free_text, ambiguous = technical_skill_extractors()
+    skills = free_text.extract(text)
+    skills += [
+        skill for skill in ambiguous.extract(_skill_list_text(text)) if skill not in skills
+    ]
+    return skills
 
 
 def _infer_experience_level(text: str) -> str:
@@ -54,7 +146,26 @@ def _infer_experience_level(text: str) -> str:
     return "beginner"
 
 
-def analyze_resume(resume_bytes: bytes | None) -> dict:
+def keyword_vocabulary_version() -> str:
+    free_text, ambiguous = technical_skill_extractors()
+    return f"{free_text.fingerprint}:{ambiguous.fingerprint}:{SOFT_SKILL_EXTRACTOR.fingerprint}"
+
+
+def _analyze_resume_text(text: str) -> dict:
+    return {
+        "technical_skills": _extract_technical_skills(text),
+        "soft_skills": SOFT_SKILL_EXTRACTOR.extract(text),
+        "experience_level": _infer_experience_level(text),
+    }
+
+
+def analyze_resume(resume_bytes: bytes | None, digest: str | None = None) -> dict:
+    """
+    Analyze a resume PDF, reusing cached results for identical uploads.
+
+    A cached entry computed with an older keyword vocabulary re-runs only
+    the keyword detection on the cached text, not the PDF parse.
+    """
     if not resume_bytes:
         return {
             "technical_skills": [],
@@ -62,64 +173,111 @@ def analyze_resume(resume_bytes: bytes | None) -> dict:
             "experience_level": "beginner",
         }
 
-    text = _extract_resume_text(resume_bytes)
-    technical_skills = _detect_keywords(text, TECHNICAL_KEYWORDS)
-    soft_skills = _detect_keywords(text, SOFT_KEYWORDS)
-    experience_level = _infer_experience_level(text)
+    digest = digest or resume_digest(resume_bytes)
+    vocabulary_version = keyword_vocabulary_version()
+    cached = resume_cache.get(digest)
+    if cached is not None:
+        if cached.vocabulary_version == vocabulary_version:
+            return cached.result
+        result = _analyze_resume_text(cached.text)
+        resume_cache.put(digest, cached.text, result, vocabulary_version)
+        return result
+
+    extraction = extract_resume_text(resume_bytes)
+    result = _analyze_resume_text(extraction.text)
+    if extraction.reason in CACHEABLE_EXTRACTIONS:
+        resume_cache.put(digest, extraction.text, result, vocabulary_version)
+    return result
+
 
+def _github_result(repos: list[dict], truncated: bool = False) -> dict:
+    languages = [repo.get("language") for repo in repos if repo.get("language")]
+    counts = Counter(languages)
     return {
-        "technical_skills": technical_skills,
-        "soft_skills": soft_skills,
-        "experience_level": experience_level,
+        "repo_count": len(repos),
+        "primary_languages": [name for name, _ in counts.most_common(3)],
+        "language_breakdown": dict(counts.most_common(5)),
+        "truncated": truncated,
     }
 
 
-def analyze_github(username: str | None) -> dict:
+async def analyze_github(username: str | None) -> dict:
+    """
+    Summarize the public repos of a GitHub user; empty if they cannot be fetched.
+
+    Users with more than GITHUB_MAX_PAGES pages of repos are summarized from
+    the first pages and flagged as truncated.
+    """
     if not username:
-        return {"repo_count": 0, "primary_languages": []}
+        return _github_result([])
 
-    url = f"https://api.github.com/users/{username}/repos"
     try:
-        print(f"DEBUG: Fetching GitHub repos for user: {username}")
-        response = requests.get(
-            url,
-            timeout=10,
-            headers={"Accept": "application/vnd.github+json"},
-        )
-        print(f"DEBUG: GitHub API Status Code: {response.status_code}")
-    except requests.RequestException as e:
-        print(f"DEBUG: GitHub API Request Exception: {e}")
-        return {"repo_count": 0, "primary_languages": []}
-
-    if response.status_code != 200:
-        print(f"DEBUG: GitHub API Error Response: {response.text}")
-        return {"repo_count": 0, "primary_languages": []}
-
-    repos = response.json()
-    if not isinstance(repos, list):
-        print(f"DEBUG: Expected list of repos, got: {type(repos)}")
-        return {"repo_count": 0, "primary_languages": []}
-    
-    print(f"DEBUG: Found {len(repos)} repos for user {username}")
+        repos, truncated = await github_client.user_repos(username)
+    except GitHubError as e:
+        print(f"GitHub analysis failed for {username}: {e}")
+        return _github_result([])
 
-    languages = [repo.get("language") for repo in repos if repo.get("language")]
-    counts = Counter(languages)
-    primary_languages = [name for name, _ in counts.most_common(3)]
-    language_breakdown = dict(counts.most_common(5))
+    return _github_result([repo for repo in repos if isinstance(repo, dict)], truncated)
 
-    return {
-        "repo_count": len(repos), 
-        "primary_languages": primary_languages,
-        "language_breakdown": language_breakdown,
-    }
 
+async def _within_deadline(
+    coro, deadline: float, side: str, timed_out: list[str], fallback: dict
+) -> dict:
+    try:
+        return await asyncio.wait_for(coro, deadline)
+    except asyncio.TimeoutError:
+        print(f"Profile analysis: {side} missed its {deadline:g}s deadline")
+        timed_out.append(side)
+        return fallback
+
+
+async def analyze_profile(
+    resume_bytes: bytes | None,
+    github_username: str | None,
+    digest: str | None = None,
+) -> dict:
+    """
+    Analyze the resume and the GitHub profile concurrently.
+
+    The PDF parse runs on extraction_executor (and a worker process) while
+    the GitHub fetch runs on the event loop, each under its own deadline. A
+    side that misses its deadline contributes empty results and is listed in
+    "timed_out"; a resume parse that finishes late still fills the cache.
+
+    Raises:
+        PdfExtractionError: If the resume could not be read at all
+    """
+    timed_out: list[str] = []
+    resume_task = asyncio.create_task(
+        _within_deadline(
+            asyncio.get_running_loop().run_in_executor(
+                extraction_executor, analyze_resume, resume_bytes, digest
+            ),
+            PROFILE_RESUME_DEADLINE_SECONDS,
+            "resume",
+            timed_out,
+            analyze_resume(None),
+        )
+    )
+    github_task = asyncio.create_task(
+        _within_deadline(
+            analyze_github(github_username),
+            PROFILE_GITHUB_DEADLINE_SECONDS,
+            "github",
+            timed_out,
+            _github_result([]),
+        )
+    )
+    try:
+        resume_result, github_result = await asyncio.gather(resume_task, github_task)
+    finally:
+        # Stop the GitHub fetch if the resume side failed
+        github_task.cancel()
 
-def analyze_profile(resume_bytes: bytes | None, github_username: str | None) -> dict:
-    resume_result = analyze_resume(resume_bytes)
-    github_result = analyze_github(github_username)
     return {
         "technical_skills": resume_result["technical_skills"],
         "soft_skills": resume_result["soft_skills"],
         "experience_level": resume_result["experience_level"],
         "github_analysis": github_result,
+        "timed_out": timed_out,
     }
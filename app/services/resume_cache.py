@@ -0,0 +1,135 @@
+"""
+Content-addressed cache for parsed resumes.
+
+Entries are keyed by the SHA-256 of the uploaded bytes and hold the
+extracted text, the analyze_resume result and the keyword vocabulary
+version the result was computed with. A bounded in-memory LRU sits in front
+of an optional SQLite tier (RESUME_CACHE_DISK_ENABLED), a SQLiteCache bounded
+by entry count with least recently used rows evicted first. The disk tier is
+off by default because it stores resume text.
+"""
+
+from __future__ import annotations
+
+import copy
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+from app.services.sqlite_cache import SQLiteCache
+
+RESUME_CACHE_PATH = Path(__file__).resolve().parent.parent / "data" / "resume_cache.sqlite3"
+RESUME_CACHE_MAX_ENTRIES = int(os.getenv("RESUME_CACHE_MAX_ENTRIES", "256"))
+RESUME_CACHE_DISK_ENABLED = os.getenv("RESUME_CACHE_DISK_ENABLED", "0") != "0"
+RESUME_CACHE_DISK_MAX_ENTRIES = int(os.getenv("RESUME_CACHE_DISK_MAX_ENTRIES", "5000"))
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS resumes (
+    digest TEXT PRIMARY KEY,
+    text TEXT NOT NULL,
+    result TEXT NOT NULL,
+    vocabulary_version TEXT NOT NULL,
+    last_access REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS resumes_last_access ON resumes (last_access);
+"""
+
+
+def resume_digest(resume_bytes: bytes) -> str:
+    return hashlib.sha256(resume_bytes).hexdigest()
+
+
+class CachedResume:
+    def __init__(self, text: str, result: dict, vocabulary_version: str) -> None:
+        self.text = text
+        self.result = result
+        self.vocabulary_version = vocabulary_version
+
+
+class ResumeCache(SQLiteCache):
+    def __init__(
+        self,
+        path: Path | None = None,
+        max_entries: int = RESUME_CACHE_MAX_ENTRIES,
+        disk_max_entries: int = RESUME_CACHE_DISK_MAX_ENTRIES,
+    ) -> None:
+        super().__init__(path, _SCHEMA, "resumes", "digest")
+        self.max_entries = max_entries
+        self.disk_max_entries = disk_max_entries
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory: OrderedDict[str, CachedResume] = OrderedDict()
+
+    def _remember(self, digest: str, entry: CachedResume) -> None:
+        self._memory[digest] = entry
+        self._memory.move_to_end(digest)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, digest: str) -> CachedResume | None:
+        """Return a copy of the cached entry, promoting disk hits into memory."""
+        with self._lock:
+            entry = self._memory.get(digest)
+            if entry is not None:
+                self._memory.move_to_end(digest)
+                self.memory_hits += 1
+                return copy.deepcopy(entry)
+            if self.path is None:
+                self.misses += 1
+                return None
+
+            conn = self._connection()
+            row = conn.execute(
+                "SELECT text, result, vocabulary_version, last_access FROM resumes "
+                "WHERE digest = ?",
+                (digest,),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._touch(conn, digest, row[3], time.time())
+            entry = CachedResume(row[0], json.loads(row[1]), row[2])
+            self._remember(digest, entry)
+            self.disk_hits += 1
+            return copy.deepcopy(entry)
+
+    def put(self, digest: str, text: str, result: dict, vocabulary_version: str) -> None:
+        entry = CachedResume(text, copy.deepcopy(result), vocabulary_version)
+        with self._lock:
+            self._remember(digest, entry)
+            if self.path is None:
+                return
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO resumes "
+                "(digest, text, result, vocabulary_version, last_access) VALUES (?, ?, ?, ?, ?)",
+                (digest, text, json.dumps(result), vocabulary_version, time.time()),
+            )
+            self._evict_lru(conn, self.disk_max_entries)
+            conn.commit()
+
+    def stats(self) -> dict:
+        disk_entries = self._count() if self.path is not None else None
+        with self._lock:
+            memory_entries = len(self._memory)
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "memory_entries": memory_entries,
+            "max_entries": self.max_entries,
+            "disk_enabled": self.path is not None,
+            "disk_entries": disk_entries,
+            "disk_max_entries": self.disk_max_entries,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round((self.memory_hits + self.disk_hits) / lookups, 4)
+            if lookups
+            else 0.0,
+        }
+
+
+resume_cache = ResumeCache(RESUME_CACHE_PATH if RESUME_CACHE_DISK_ENABLED else None)
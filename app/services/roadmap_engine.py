@@ -6,11 +6,61 @@ Deterministic fallback if AI generation is unavailable.
 
 from __future__ import annotations
 
+import asyncio
+import hashlib
 import json
-import requests
+import os
+import time
+from typing import AsyncIterator, Awaitable
 
-OLLAMA_URL = "http://127.0.0.1:11434/api/generate"
+import httpx
+
+from app.services import llm_client
+from app.services.circuit_breaker import CircuitOpenError
+from app.services.roadmap_store import roadmap_store
+
+ROADMAP_MODEL = "llama3"
+DEFAULT_ROLE_CONTEXT = "Backend Developer"
 OLLAMA_TIMEOUT = 90
+# Each week gets its own budget; a week that misses it falls back to the template.
+# The budget is the LLM request's own timeout, so a slow Ollama shows up in the
+# circuit breaker; the grace only backstops the cache lookup and the queue.
+WEEK_DEADLINE_SECONDS = float(os.getenv("ROADMAP_WEEK_DEADLINE_SECONDS", "60"))
+WEEK_DEADLINE_GRACE_SECONDS = 1.0
+
+SOURCE_PREGENERATED = "pregenerated"
+SOURCE_AI = "ai"
+SOURCE_TEMPLATE = "template"
+
+AI_PLAN_ERRORS = (
+    httpx.HTTPError,
+    CircuitOpenError,
+    json.JSONDecodeError,
+    KeyError,
+    TypeError,
+    ValueError,
+)
+
+# Static instructions go in the system prompt so Ollama can reuse their
+# evaluated tokens across calls; only skill and role vary per request
+ROADMAP_SYSTEM_PROMPT = (
+    "Return ONLY valid JSON. "
+    "Generate exactly 7 objects for a 7-day learning plan. "
+    "Each object must be in this format: "
+    '{"day": number, "task": string, "description": string}. '
+    "Format strictly as a JSON array. No explanation. No markdown."
+)
+
+CAPSTONE_DAY = {
+    "day": 29,
+    "task": "Capstone Project",
+    "description": "Build a capstone project combining all learned skills.",
+}
+REVIEW_DAY = {
+    "day": 30,
+    "task": "Mock Interview & Review",
+    "description": "Conduct a mock interview and review all concepts.",
+}
 
 # Fallback templates if Ollama fails
 DAILY_TASK_TEMPLATES = {
@@ -34,7 +84,56 @@ DAILY_DESCRIPTIONS = {
 }
 
 
-def generate_ai_week_plan(skill: str, role_context: str) -> list[dict]:
+def _parse_week_plan(raw_text: str) -> list[dict]:
+    start = raw_text.find("[")
+    end = raw_text.rfind("]")
+    if start == -1 or end == -1:
+        raise ValueError("No JSON array found in Ollama response")
+
+    extracted_json = raw_text[start : end + 1]
+    week_plan = json.loads(extracted_json)
+
+    if not isinstance(week_plan, list):
+        raise ValueError("Response is not a JSON array")
+
+    if len(week_plan) < 7:
+        raise ValueError(f"Expected at least 7 items, got {len(week_plan)}")
+
+    return week_plan[:7]
+
+
+async def request_ai_week_plan(
+    skill: str,
+    role_context: str,
+    use_cache: bool = True,
+    use_breaker: bool = True,
+    deadline: float | None = None,
+) -> list[dict]:
+    """
+    Ask Ollama for a 7-day learning plan, without any fallback.
+
+    use_cache, use_breaker and deadline are passed to llm_client.generate.
+
+    Raises:
+        One of AI_PLAN_ERRORS if the call fails or the response is unusable
+    """
+    prompt = f"Skill: {skill}\nRole: {role_context}"
+    return await llm_client.generate(
+        ROADMAP_MODEL,
+        prompt,
+        options={
+            "temperature": 0.3,
+        },
+        timeout=OLLAMA_TIMEOUT,
+        parse=_parse_week_plan,
+        use_cache=use_cache,
+        system=ROADMAP_SYSTEM_PROMPT,
+        use_breaker=use_breaker,
+        deadline=deadline,
+    )
+
+
+async def generate_ai_week_plan(skill: str, role_context: str) -> list[dict]:
     """
     Generate a 7-day learning plan using Ollama.
 
@@ -47,59 +146,10 @@ def generate_ai_week_plan(skill: str, role_context: str) -> list[dict]:
     Returns:
         List of daily tasks
     """
-    prompt = (
-        "Return ONLY valid JSON. "
-        "Generate exactly 7 objects for a 7-day learning plan. "
-        "Each object must be in this format: "
-        '{"day": number, "task": string, "description": string}.\n\n'
-        f"Skill: {skill}\n"
-        f"Role: {role_context}\n"
-        "Format strictly as a JSON array. No explanation. No markdown."
-    )
-
     try:
-        resp = requests.post(
-            OLLAMA_URL,
-            json={
-                "model": "llama3",
-                "prompt": prompt,
-                "stream": False,
-                "options": {
-                    "temperature": 0.3,
-                },
-            },
-            timeout=OLLAMA_TIMEOUT,
-        )
-        resp.raise_for_status()
-
-        response_json = resp.json()
-        raw_text = str(response_json.get("response", "")).strip()
-
-        start = raw_text.find("[")
-        end = raw_text.rfind("]")
-        if start == -1 or end == -1:
-            raise ValueError("No JSON array found in Ollama response")
-
-        extracted_json = raw_text[start : end + 1]
-        week_plan = json.loads(extracted_json)
-
-        if not isinstance(week_plan, list):
-            raise ValueError("Response is not a JSON array")
-
-        if len(week_plan) < 7:
-            raise ValueError(f"Expected at least 7 items, got {len(week_plan)}")
-
-        return week_plan[:7]
-
-    except (
-        requests.RequestException,
-        json.JSONDecodeError,
-        KeyError,
-        TypeError,
-        ValueError,
-    ):
+        return await request_ai_week_plan(skill, role_context)
+    except AI_PLAN_ERRORS:
         print("Ollama failed, using fallback")
-        pass
 
     # Fallback to deterministic template
     return generate_deterministic_week_plan(skill)
@@ -131,18 +181,68 @@ def generate_deterministic_week_plan(skill: str) -> list[dict]:
     return days
 
 
-def generate_roadmap(
-    missing_skills: list[dict], role_context: str = "Backend Developer"
-) -> dict:
+def week_fingerprint(role_context: str, skill: str, importance: int) -> str:
+    """Identify a week by what its plan depends on: role, focus skill and importance."""
+    key = f"{role_context.strip()}\x00{skill.lower().strip()}\x00{importance}"
+    return hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+
+async def _build_week(week_num: int, skill_dict: dict, role_context: str) -> dict:
+    skill_name = skill_dict.get("skill", "Skill")
+    importance = skill_dict.get("importance", 0)
+
+    stored_days = roadmap_store.get(role_context, skill_name)
+    if stored_days is not None:
+        return {
+            "week": week_num,
+            "focus_skill": skill_name,
+            "importance": importance,
+            "days": stored_days,
+            "source": SOURCE_PREGENERATED,
+            "fingerprint": week_fingerprint(role_context, skill_name, importance),
+        }
+
+    try:
+        deadline = time.monotonic() + WEEK_DEADLINE_SECONDS
+        days = await asyncio.wait_for(
+            request_ai_week_plan(skill_name, role_context, deadline=deadline),
+            WEEK_DEADLINE_SECONDS + WEEK_DEADLINE_GRACE_SECONDS,
+        )
+        source = SOURCE_AI
+    except (asyncio.TimeoutError, *AI_PLAN_ERRORS) as e:
+        print(f"Week {week_num} ({skill_name}) using template: {type(e).__name__}")
+        days = generate_deterministic_week_plan(skill_name)
+        source = SOURCE_TEMPLATE
+
+    return {
+        "week": week_num,
+        "focus_skill": skill_name,
+        "importance": importance,
+        "days": days,
+        "source": source,
+        "fingerprint": week_fingerprint(role_context, skill_name, importance),
+    }
+
+
+def plan_roadmap(
+    missing_skills: list[dict],
+    role_context: str = DEFAULT_ROLE_CONTEXT,
+    previous_weeks: list[dict] | None = None,
+) -> tuple[list[Awaitable[dict]], dict]:
     """
-    Generate a 30-day learning roadmap using AI-generated weekly plans.
+    Pick the roadmap's focus skills and prepare one awaitable per week.
+
+    When the user's previous roadmap is given, weeks whose fingerprint is
+    unchanged are reused as-is and only the rest are regenerated. Template
+    weeks are always regenerated so a failed AI plan is retried.
 
     Args:
         missing_skills: List of dicts with 'skill' and 'importance'
         role_context: The role context for AI generation
+        previous_weeks: Weeks of the user's previous roadmap, with fingerprints
 
     Returns:
-        Dict with 'roadmap' containing weekly plans
+        Week awaitables in week order, and the diff against the previous roadmap
     """
     sorted_skills = sorted(
         missing_skills, key=lambda x: x.get("importance", 0), reverse=True
@@ -150,42 +250,90 @@ def generate_roadmap(
 
     top_skills = sorted_skills[:4]
 
-    roadmap = []
+    reusable = {
+        week["fingerprint"]: week
+        for week in previous_weeks or []
+        if week.get("fingerprint") and week.get("source") != SOURCE_TEMPLATE
+    }
+    diff = {"reused": [], "regenerated": [], "removed": []}
+
+    async def reuse(week: dict) -> dict:
+        return week
 
+    weeks = []
     for week_num, skill_dict in enumerate(top_skills, start=1):
         skill_name = skill_dict.get("skill", "Skill")
-        importance = skill_dict.get("importance", 0)
-
-        # Optimization: Only use AI for the first week (highest priority) to reduce latency
-        # Subsequent weeks use deterministic templates
-        if week_num == 1:
-            days = generate_ai_week_plan(skill_name, role_context)
+        fingerprint = week_fingerprint(
+            role_context, skill_name, skill_dict.get("importance", 0)
+        )
+        previous = reusable.get(fingerprint)
+        if previous is not None:
+            diff["reused"].append(skill_name)
+            weeks.append(reuse({**previous, "week": week_num}))
         else:
-            days = generate_deterministic_week_plan(skill_name)
+            diff["regenerated"].append(skill_name)
+            weeks.append(_build_week(week_num, skill_dict, role_context))
+
+    current_skills = {skill_dict.get("skill", "Skill").lower() for skill_dict in top_skills}
+    diff["removed"] = [
+        week["focus_skill"]
+        for week in previous_weeks or []
+        if week["focus_skill"].lower() not in current_skills
+    ]
+
+    return weeks, diff
 
-        roadmap.append(
-            {
-                "week": week_num,
-                "focus_skill": skill_name,
-                "importance": importance,
-                "days": days,
-            }
-        )
+
+async def iter_completed_weeks(weeks: list[Awaitable[dict]]) -> AsyncIterator[dict]:
+    """
+    Run all weeks concurrently and yield each one as soon as it is ready.
+
+    Weeks still running when the consumer stops iterating are cancelled.
+    """
+    tasks = [asyncio.ensure_future(week) for week in weeks]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            yield await next_done
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+async def generate_roadmap(
+    missing_skills: list[dict],
+    role_context: str = DEFAULT_ROLE_CONTEXT,
+    previous_weeks: list[dict] | None = None,
+) -> dict:
+    """
+    Generate a 30-day learning roadmap using AI-generated weekly plans.
+
+    Plans pre-generated by scripts/pregenerate_roadmaps.py are used first;
+    only (role, skill) pairs missing from the store go to the LLM. Weeks
+    whose AI plan fails or misses WEEK_DEADLINE_SECONDS use the
+    deterministic template; each week's "source" records which was used.
+    See plan_roadmap for how a previous roadmap is reused.
+
+    Args:
+        missing_skills: List of dicts with 'skill' and 'importance'
+        role_context: The role context for AI generation
+        previous_weeks: Weeks of the user's previous roadmap, with fingerprints
+
+    Returns:
+        Dict with 'roadmap' containing weekly plans and a 'diff' against
+        the previous roadmap
+    """
+    weeks, diff = plan_roadmap(missing_skills, role_context, previous_weeks)
+
+    # All weeks are generated concurrently, so total latency is roughly one generation
+    roadmap = list(await asyncio.gather(*weeks))
 
     roadmap_summary = {
         "roadmap": roadmap,
-        "capstone": {
-            "day": 29,
-            "task": "Capstone Project",
-            "description": "Build a capstone project combining all learned skills.",
-        },
-        "review": {
-            "day": 30,
-            "task": "Mock Interview & Review",
-            "description": "Conduct a mock interview and review all concepts.",
-        },
+        "capstone": dict(CAPSTONE_DAY),
+        "review": dict(REVIEW_DAY),
         "total_days": 30,
-        "total_skills": len(top_skills),
+        "total_skills": len(roadmap),
+        "diff": diff,
     }
 
     return roadmap_summary
@@ -0,0 +1,97 @@
+"""
+On-disk store of pre-generated week plans, keyed by (role, skill).
+
+Filled offline by scripts/pregenerate_roadmaps.py and read first by
+generate_roadmap. The file is append-only JSON Lines (one compact record per
+pair, later records win), so an interrupted pre-generation run keeps every
+pair it finished and a re-run only fills in what is missing. The store is
+re-read whenever the file changes on disk.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+from pathlib import Path
+
+STORE_PATH = Path(__file__).resolve().parent.parent / "data" / "roadmap_store.jsonl"
+
+
+def _key(role: str, skill: str) -> tuple[str, str]:
+    return role.strip(), skill.lower().strip()
+
+
+class RoadmapStore:
+    def __init__(self, path: Path = STORE_PATH) -> None:
+        self.path = path
+        self._plans: dict[tuple[str, str], list[dict]] = {}
+        self._mtime: float | None = None
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        try:
+            mtime = self.path.stat().st_mtime
+        except FileNotFoundError:
+            self._plans, self._mtime = {}, None
+            return
+        if mtime == self._mtime:
+            return
+        plans = {}
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                    plans[_key(record["role"], record["skill"])] = record["days"]
+                except (ValueError, KeyError, TypeError):
+                    # Tolerate a torn final line from an interrupted run
+                    continue
+        self._plans, self._mtime = plans, mtime
+
+    def get(self, role: str, skill: str) -> list[dict] | None:
+        with self._lock:
+            self._refresh()
+            return self._plans.get(_key(role, skill))
+
+    def __contains__(self, pair: tuple[str, str]) -> bool:
+        return self.get(*pair) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._plans)
+
+    def put(self, role: str, skill: str, days: list[dict]) -> None:
+        record = {"role": role, "skill": skill, "days": days}
+        with self._lock:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(json.dumps(record, separators=(",", ":")) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._plans[_key(role, skill)] = days
+
+    def compact(self, keep: set[tuple[str, str]] | None = None) -> int:
+        """
+        Rewrite the file with one record per pair, optionally dropping pairs
+        not in `keep`. Returns the number of pairs written.
+        """
+        with self._lock:
+            self._refresh()
+            keep_keys = None if keep is None else {_key(*pair) for pair in keep}
+            plans = {
+                pair: days
+                for pair, days in self._plans.items()
+                if keep_keys is None or pair in keep_keys
+            }
+            tmp_path = self.path.with_suffix(".tmp")
+            with open(tmp_path, "w") as f:
+                for (role, skill), days in sorted(plans.items()):
+                    record = {"role": role, "skill": skill, "days": days}
+                    f.write(json.dumps(record, separators=(",", ":")) + "\n")
+            os.replace(tmp_path, self.path)
+            self._plans, self._mtime = plans, None
+            return len(plans)
+
+
+roadmap_store = RoadmapStore()
@@ -1,67 +1,38 @@
 """
 Role analysis engine using market skill data.
 
-Loads skill frequencies from app/data/market_skills.json at startup.
+Skill frequencies come from app/data/market_skills.json via the hot-reloading
+market data provider; each call works on a single snapshot and only filters
+that snapshot's precomputed role profiles by the user's skills.
 """
 
-import json
-from pathlib import Path
+from app.services.market_data import MarketSnapshot, market_data
 
-from app.services.skill_curation import get_skill_curation
-MARKET_DATA_PATH = Path(__file__).resolve().parent.parent / "data" / "market_skills.json"
 
-
-def _load_market_data() -> dict:
-    if not MARKET_DATA_PATH.exists():
-        return {}
-    with open(MARKET_DATA_PATH) as f:
-        return json.load(f)
-
-
-MARKET_DATA = _load_market_data()
-
-
-def analyze_role(user_skills: list[str], selected_role: str) -> dict:
-    if selected_role not in MARKET_DATA:
+def analyze_role(
+    user_skills: list[str], selected_role: str, snapshot: MarketSnapshot | None = None
+) -> dict:
+    snapshot = snapshot or market_data.current()
+    if selected_role not in snapshot.data:
         return {
             "alignment_score": 0.0,
             "missing_skills": [],
+            "market_data_version": snapshot.version,
         }
 
-    role_skills = MARKET_DATA[selected_role]
-    user_skills_normalized = [s.lower().strip() for s in user_skills]
+    profile = snapshot.profiles[selected_role]
+    user_skills_normalized = snapshot.skill_matcher.canonical_skills(user_skills)
 
-    total_weight = 0
+    total_weight = profile.total_weight
     earned_weight = 0
     missing_skills = []
 
-    for skill, frequency in role_skills.items():
-        importance_weight = round(frequency * 10)
-        total_weight += importance_weight
-
-        if skill.lower() in user_skills_normalized:
+    # Payloads are precomputed and already sorted by importance
+    for skill_key, importance_weight, payload in profile.entries:
+        if skill_key in user_skills_normalized:
             earned_weight += importance_weight
         else:
-            percentage = round(frequency * 100, 2)
-            why_this_skill_matters = (
-                f"{skill} appears in {percentage}% of {selected_role} job postings "
-                f"and is critical for {selected_role}-level responsibilities."
-            )
-            market_signal = (
-                f"Mentioned in {percentage}% of {selected_role} postings."
-            )
-            curation = get_skill_curation(skill.lower().strip())
-            missing_skills.append(
-                {
-                    "skill": skill,
-                    "importance": importance_weight,
-                    "why_this_skill_matters": why_this_skill_matters,
-                    "market_signal": market_signal,
-                    "learning_resources": curation.get("learning_resources", []),
-                    "recommended_project": curation.get("recommended_project", {}),
-                    "checkpoints": curation.get("checkpoints", []),
-                }
-            )
+            missing_skills.append(payload)
 
     alignment_score = (
         round((earned_weight / total_weight) * 100, 2)
@@ -69,9 +40,8 @@ def analyze_role(user_skills: list[str], selected_role: str) -> dict:
         else 0.0
     )
 
-    missing_skills.sort(key=lambda x: x["importance"], reverse=True)
-
     return {
         "alignment_score": alignment_score,
         "missing_skills": missing_skills,
+        "market_data_version": snapshot.version,
     }
@@ -0,0 +1,147 @@
+"""
+Precompiled role indexes, built once per market data snapshot.
+
+RoleIndex scores a user against every role at once: a skill vocabulary, a
+role-by-skill weight matrix (the same round(frequency * 10) weights
+analyze_role uses) and each role's total weight. A user's skills are encoded
+as a 0/1 vector over the vocabulary, so the alignment of every role is one
+matrix-vector product.
+
+InvertedRoleIndex answers "which roles am I closest to?" from skill -> role
+postings built off a RoleIndex, touching only the roles that share a skill
+with the user.
+"""
+
+from __future__ import annotations
+
+import heapq
+import itertools
+
+import numpy as np
+
+
+def normalize_skill(skill: str) -> str:
+    return skill.lower().strip()
+
+
+class RoleIndex:
+    def __init__(self, market_data: dict[str, dict[str, float]]) -> None:
+        self.roles = list(market_data)
+        self.vocabulary = sorted(
+            {normalize_skill(skill) for skills in market_data.values() for skill in skills}
+        )
+        self.skill_ids = {skill: i for i, skill in enumerate(self.vocabulary)}
+
+        self.weights = np.zeros((len(self.roles), len(self.vocabulary)), dtype=np.float64)
+        # Per role: its skill ids, most important first (analyze_role's order)
+        self.role_skill_ids: list[np.ndarray] = []
+        for row, skills in enumerate(market_data.values()):
+            ids = [self.skill_ids[normalize_skill(skill)] for skill in skills]
+            for skill_id, frequency in zip(ids, skills.values()):
+                self.weights[row, skill_id] = round(frequency * 10)
+            ids = np.array(ids, dtype=np.int64)
+            self.role_skill_ids.append(ids[np.argsort(-self.weights[row, ids], kind="stable")])
+        self.totals = self.weights.sum(axis=1)
+
+    def encode(self, user_skills: list[str]) -> np.ndarray:
+        """One-hot encode a skill list; skills outside the vocabulary are ignored."""
+        vector = np.zeros(len(self.vocabulary), dtype=np.float64)
+        ids = [
+            self.skill_ids[skill]
+            for skill in map(normalize_skill, user_skills)
+            if skill in self.skill_ids
+        ]
+        vector[ids] = 1.0
+        return vector
+
+    def alignment_scores(self, user_vector: np.ndarray) -> np.ndarray:
+        """Alignment percentage (0-100) of every role, in self.roles order."""
+        earned = self.weights @ user_vector
+        scores = np.divide(
+            earned * 100, self.totals, out=np.zeros_like(earned), where=self.totals > 0
+        )
+        return np.round(scores, 2)
+
+    def rank(self, user_skills: list[str]) -> list[dict]:
+        """All roles sorted by alignment, best first (ties keep market-data order)."""
+        scores = self.alignment_scores(self.encode(user_skills))
+        order = np.argsort(-scores, kind="stable")
+        return [
+            {"role": self.roles[i], "alignment_score": float(scores[i])}
+            for i in order
+        ]
+
+
+class InvertedRoleIndex:
+    """
+    Skill -> (role, weight) postings for top-k role recommendation.
+
+    A query only touches the postings of the user's own skills, so its cost
+    grows with the number of matching (skill, role) pairs rather than with
+    the number of roles. Weights, totals and each role's importance order
+    come from the RoleIndex it is built from.
+    """
+
+    def __init__(self, index: RoleIndex) -> None:
+        self.index = index
+        self.postings: dict[int, list[tuple[int, float]]] = {}
+        for role_id, skill_ids in enumerate(index.role_skill_ids):
+            for skill_id in skill_ids.tolist():
+                self.postings.setdefault(skill_id, []).append(
+                    (role_id, float(index.weights[role_id, skill_id]))
+                )
+
+    def top_k(self, user_skills: list[str], k: int = 3) -> list[dict]:
+        """
+        The k roles with the highest alignment, each with the missing skill
+        whose acquisition would raise that alignment the most.
+
+        When fewer than k roles share a skill with the user, the remaining
+        slots go to zero-alignment roles in market-data order.
+        """
+        index = self.index
+        skill_ids = {
+            index.skill_ids[skill]
+            for skill in map(normalize_skill, user_skills)
+            if skill in index.skill_ids
+        }
+        earned: dict[int, float] = {}
+        for skill_id in skill_ids:
+            for role_id, weight in self.postings.get(skill_id, ()):
+                earned[role_id] = earned.get(role_id, 0.0) + weight
+
+        def alignment(role_id: int) -> float:
+            total = float(index.totals[role_id])
+            return earned.get(role_id, 0.0) * 100 / total if total else 0.0
+
+        best = heapq.nlargest(k, earned, key=lambda role_id: (alignment(role_id), -role_id))
+        if len(best) < k:
+            unmatched = (role_id for role_id in range(len(index.roles)) if role_id not in earned)
+            best.extend(itertools.islice(unmatched, k - len(best)))
+
+        recommendations = []
+        for role_id in best:
+            total = float(index.totals[role_id])
+            next_skill_id = next(
+                (
+                    skill_id
+                    for skill_id in index.role_skill_ids[role_id].tolist()
+                    if skill_id not in skill_ids
+                ),
+                None,
+            )
+            recommendations.append(
+                {
+                    "role": index.roles[role_id],
+                    "alignment_score": round(alignment(role_id), 2),
+                    "next_skill": index.vocabulary[next_skill_id]
+                    if next_skill_id is not None
+                    else None,
+                    "alignment_gain": round(
+                        float(index.weights[role_id, next_skill_id]) * 100 / total, 2
+                    )
+                    if next_skill_id is not None and total
+                    else 0.0,
+                }
+            )
+        return recommendations
@@ -0,0 +1,54 @@
+"""
+Precomputed per-role analysis payloads.
+
+Everything analyze_role reports about a missing skill depends only on
+(role, skill): its importance weight, the two explanation strings and the
+curated resources. RoleProfile builds those payloads once per market data
+snapshot, already in analyze_role's importance order, so a request only
+filters them by the user's skill set. The payload dicts are shared between
+requests and must be treated as read-only.
+"""
+
+from __future__ import annotations
+
+from app.services.skill_curation import get_skill_curation
+
+
+def _missing_skill_payload(role: str, skill: str, frequency: float, importance: int) -> dict:
+    percentage = round(frequency * 100, 2)
+    curation = get_skill_curation(skill.lower().strip())
+    return {
+        "skill": skill,
+        "importance": importance,
+        "why_this_skill_matters": (
+            f"{skill} appears in {percentage}% of {role} job postings "
+            f"and is critical for {role}-level responsibilities."
+        ),
+        "market_signal": f"Mentioned in {percentage}% of {role} postings.",
+        "learning_resources": curation.get("learning_resources", []),
+        "recommended_project": curation.get("recommended_project", {}),
+        "checkpoints": curation.get("checkpoints", []),
+    }
+
+
+class RoleProfile:
+    def __init__(self, role: str, skills: dict[str, float]) -> None:
+        self.role = role
+        entries = []
+        for skill, frequency in skills.items():
+            importance = round(frequency * 10)
+            entries.append(
+                (
+                    skill.lower(),
+                    importance,
+                    _missing_skill_payload(role, skill, frequency, importance),
+                )
+            )
+        # Stable sort keeps market-data order among equal importances
+        entries.sort(key=lambda entry: entry[1], reverse=True)
+        self.entries: tuple[tuple[str, int, dict], ...] = tuple(entries)
+        self.total_weight = sum(importance for _, importance, _ in entries)
+
+
+def build_role_profiles(market_data: dict[str, dict[str, float]]) -> dict[str, RoleProfile]:
+    return {role: RoleProfile(role, skills) for role, skills in market_data.items()}
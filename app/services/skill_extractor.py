@@ -0,0 +1,119 @@
+"""
+Multi-pattern skill extraction with an Aho-Corasick automaton.
+
+All patterns are compiled into one automaton, so extraction is a single
+linear pass over the text regardless of vocabulary size. A match only counts
+on token boundaries (no letter or digit directly before or after it), so
+"java" does not match inside "javascript" and "node" does not match "nodes".
+Version suffixes are the exception: a digit may follow a pattern that ends
+in a letter or symbol ("python3", "tensorflow2", "c++17").
+Overlapping matches resolve leftmost-longest: "node.js" is one match, not
+"node" plus "js".
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections import deque
+from typing import Iterable
+
+
+def _is_word_char(char: str) -> bool:
+    return char.isalnum()
+
+
+def _ends_on_boundary(last: str, following: str) -> bool:
+    """Whether a match ending in `last` may be followed by `following`."""
+    if not _is_word_char(last):
+        return True
+    return not _is_word_char(following) or (not last.isdigit() and following.isdigit())
+
+
+class SkillExtractor:
+    def __init__(self, patterns: dict[str, str]) -> None:
+        """
+        Args:
+            patterns: Lower-case pattern -> canonical skill it reports
+        """
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        # Per state: (pattern length, canonical skill) of patterns ending there
+        self._out: list[list[tuple[int, str]]] = [[]]
+
+        for pattern, canonical in patterns.items():
+            pattern = pattern.lower().strip()
+            if not pattern:
+                continue
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append([])
+                state = next_state
+            self._out[state].append((len(pattern), canonical))
+
+        # Breadth-first fail links; outputs inherit their fail state's outputs
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                candidate = self._goto[fail].get(char, 0)
+                self._fail[next_state] = candidate if candidate != next_state else 0
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+        self.pattern_count = len(patterns)
+        # Identifies the vocabulary, e.g. to tell whether cached results are stale
+        encoded = json.dumps(sorted(patterns.items()), separators=(",", ":"))
+        self.fingerprint = hashlib.sha256(encoded.encode("utf-8")).hexdigest()[:16]
+
+    def _matches(self, text: str) -> list[tuple[int, int, str]]:
+        goto, fail, out = self._goto, self._fail, self._out
+        text_length = len(text)
+        matches = []
+        state = 0
+        for end, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not out[state]:
+                continue
+            # Every pattern ending in this state ends in `char`
+            if end + 1 < text_length and not _ends_on_boundary(char, text[end + 1]):
+                continue
+            for length, canonical in out[state]:
+                start = end - length + 1
+                if start == 0 or not _is_word_char(text[start - 1]):
+                    matches.append((start, end + 1, canonical))
+        return matches
+
+    def extract(self, text: str) -> list[str]:
+        """Canonical skills found in lower-cased text, in order of first appearance."""
+        matches = sorted(self._matches(text), key=lambda m: (m[0], m[0] - m[1]))
+        found: dict[str, None] = {}
+        covered_until = 0
+        for start, end, canonical in matches:
+            if start < covered_until:
+                continue
+            covered_until = end
+            found.setdefault(canonical, None)
+        return list(found)
+
+
+def build_patterns(
+    keywords: Iterable[str], aliases: dict[str, str] | None = None
+) -> dict[str, str]:
+    """Pattern table mapping each keyword to itself and each alias to its target."""
+    patterns = {keyword.lower().strip(): keyword.lower().strip() for keyword in keywords}
+    for alias, canonical in (aliases or {}).items():
+        patterns[alias.lower().strip()] = canonical
+        patterns.setdefault(canonical, canonical)
+    return patterns
@@ -0,0 +1,109 @@
+"""
+Map free-form user skills onto the canonical market skill vocabulary.
+
+Each raw skill goes through, in order: exact vocabulary match, the
+SKILL_NORMALIZATIONS alias table, then a fuzzy match. The fuzzy match uses
+character trigram TF-IDF vectors: the vocabulary is precompiled into an
+L2-normalised (skills x trigrams) matrix, and a query's cosine similarity to
+every skill is one product over the query's known trigrams. The best match
+is accepted at or above FUZZY_SKILL_THRESHOLD; otherwise the skill is kept
+as typed (lower-cased). Results are cached per raw string.
+"""
+
+from __future__ import annotations
+
+import math
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+
+from app.services.skill_normalization import SKILL_NORMALIZATIONS
+
+# Tuned on the market vocabulary: accepts "reactjs", "python3", "kubernets",
+# "tensor flow"; rejects "typescript" -> "javascript" and "go" -> "django"
+FUZZY_SKILL_THRESHOLD = float(os.getenv("FUZZY_SKILL_THRESHOLD", "0.55"))
+SKILL_MATCH_CACHE_SIZE = int(os.getenv("SKILL_MATCH_CACHE_SIZE", "4096"))
+
+NGRAM_SIZE = 3
+SEPARATOR_PATTERN = re.compile(r"[\s._\-/]+")
+
+
+def _clean(skill: str) -> str:
+    return skill.lower().strip()
+
+
+def _ngrams(skill: str) -> list[str]:
+    padded = "^" + SEPARATOR_PATTERN.sub(" ", skill).strip() + "$"
+    return [padded[i : i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)]
+
+
+class SkillMatcher:
+    def __init__(
+        self,
+        vocabulary: list[str],
+        threshold: float = FUZZY_SKILL_THRESHOLD,
+        cache_size: int = SKILL_MATCH_CACHE_SIZE,
+    ) -> None:
+        self.vocabulary = sorted({_clean(skill) for skill in vocabulary})
+        self.threshold = threshold
+        self._known = set(self.vocabulary)
+
+        skill_ngrams = [Counter(_ngrams(skill)) for skill in self.vocabulary]
+        self.ngram_ids: dict[str, int] = {}
+        for counts in skill_ngrams:
+            for ngram in counts:
+                self.ngram_ids.setdefault(ngram, len(self.ngram_ids))
+
+        document_frequency = np.zeros(len(self.ngram_ids))
+        for counts in skill_ngrams:
+            document_frequency[[self.ngram_ids[ngram] for ngram in counts]] += 1
+        # Smoothed IDF; an n-gram no skill contains gets the maximum weight
+        n_skills = len(self.vocabulary)
+        self.idf = np.log((1 + n_skills) / (1 + document_frequency)) + 1
+        self.unknown_idf = math.log(1 + n_skills) + 1
+
+        self.matrix = np.zeros((n_skills, len(self.ngram_ids)), dtype=np.float64)
+        for row, counts in enumerate(skill_ngrams):
+            for ngram, count in counts.items():
+                self.matrix[row, self.ngram_ids[ngram]] = count
+        self.matrix *= self.idf
+        norms = np.linalg.norm(self.matrix, axis=1, keepdims=True)
+        np.divide(self.matrix, norms, out=self.matrix, where=norms > 0)
+
+        self.canonicalize = lru_cache(maxsize=cache_size)(self._canonicalize)
+
+    def similarities(self, skill: str) -> np.ndarray:
+        """Cosine similarity of a cleaned skill to every vocabulary skill."""
+        counts = Counter(_ngrams(skill))
+        ids, weights, unknown = [], [], 0.0
+        for ngram, count in counts.items():
+            ngram_id = self.ngram_ids.get(ngram)
+            if ngram_id is None:
+                unknown += (count * self.unknown_idf) ** 2
+            else:
+                ids.append(ngram_id)
+                weights.append(count * self.idf[ngram_id])
+        if not ids:
+            return np.zeros(len(self.vocabulary))
+        weights = np.asarray(weights)
+        norm = math.sqrt(float(weights @ weights) + unknown)
+        return self.matrix[:, ids] @ weights / norm
+
+    def _canonicalize(self, raw_skill: str) -> str:
+        skill = _clean(raw_skill)
+        if skill in self._known:
+            return skill
+        alias = SKILL_NORMALIZATIONS.get(skill)
+        if alias is not None:
+            return alias
+        if not skill or not self.vocabulary:
+            return skill
+        scores = self.similarities(skill)
+        best = int(scores.argmax())
+        return self.vocabulary[best] if scores[best] >= self.threshold else skill
+
+    def canonical_skills(self, raw_skills: list[str]) -> set[str]:
+        return {self.canonicalize(skill) for skill in raw_skills}
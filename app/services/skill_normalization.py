@@ -0,0 +1,46 @@
+"""
+Canonical skill names shared by the dataset pipeline and the role engines.
+
+SKILL_NORMALIZATIONS maps aliases and abbreviations to the canonical skill
+names used in app/data/market_skills.json.
+"""
+
+SKILL_NORMALIZATIONS = {
+    "python3": "python",
+    "js": "javascript",
+    "ts": "typescript",
+    "sql server": "sql",
+    "nosql": "mongodb",
+    "ml": "machine learning",
+    "ai": "artificial intelligence",
+    "devops": "devops",
+    "k8s": "kubernetes",
+    "gs": "google suite",
+    "reactjs": "react",
+    "react.js": "react",
+    "nodejs": "node",
+    "node.js": "node",
+    "postgres": "sql",
+    "postgresql": "sql",
+    "mysql": "sql",
+    "t-sql": "sql",
+    "restful": "rest",
+    "rest api": "rest",
+    "amazon web services": "aws",
+    "google cloud": "gcp",
+    "google cloud platform": "gcp",
+    "microsoft azure": "azure",
+    "csharp": "c#",
+    "cpp": "c++",
+    "ms excel": "excel",
+    "microsoft excel": "excel",
+    "powerbi": "power bi",
+    "torch": "pytorch",
+}
+
+
+def normalize_skill(skill: str) -> str | None:
+    if not skill:
+        return None
+    normalized = skill.lower().strip()
+    return SKILL_NORMALIZATIONS.get(normalized, normalized)
@@ -0,0 +1,83 @@
+"""
+Shared SQLite plumbing for the persistent caches (LLM responses, parsed
+resumes, GitHub responses).
+
+Each cache owns one lazily opened connection in WAL mode, serialized by a
+lock, and a table with a last_access column that bounds it by entry count,
+least recently used rows evicted first. A hit rewrites last_access only once
+it is older than the cache's touch interval, so hot entries cost no write per
+lookup.
+
+Every method does blocking SQLite I/O; async callers go through
+asyncio.to_thread.
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import threading
+from pathlib import Path
+
+
+class SQLiteCache:
+    def __init__(
+        self,
+        path: Path | None,
+        schema: str,
+        table: str,
+        key_column: str,
+        touch_interval: float = 0.0,
+    ) -> None:
+        """
+        Args:
+            path: SQLite file, created on first use; None for caches without a disk tier
+            schema: Script creating the tables and indexes if they do not exist
+            table: Table bounded by entry count, with a last_access column
+            key_column: Primary key column of that table
+            touch_interval: Seconds a hit's last_access may lag before it is rewritten
+        """
+        self.path = path
+        self.touch_interval = touch_interval
+        self._schema = schema
+        self._table = table
+        self._key_column = key_column
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(self._schema)
+            self._conn = conn
+        return self._conn
+
+    def _touch(self, conn: sqlite3.Connection, key: str, last_access: float, now: float) -> None:
+        """Record a hit, unless last_access is still within the touch interval."""
+        if now - last_access > self.touch_interval:
+            conn.execute(
+                f"UPDATE {self._table} SET last_access = ? WHERE {self._key_column} = ?",
+                (now, key),
+            )
+            conn.commit()
+
+    def _evict_lru(self, conn: sqlite3.Connection, max_entries: int) -> int:
+        """Delete the least recently used rows over max_entries. Returns rows removed."""
+        (count,) = conn.execute(f"SELECT COUNT(*) FROM {self._table}").fetchone()
+        overflow = count - max_entries
+        if overflow <= 0:
+            return 0
+        conn.execute(
+            f"DELETE FROM {self._table} WHERE {self._key_column} IN "
+            f"(SELECT {self._key_column} FROM {self._table} ORDER BY last_access ASC LIMIT ?)",
+            (overflow,),
+        )
+        return overflow
+
+    def _count(self) -> int:
+        with self._lock:
+            (count,) = self._connection().execute(
+                f"SELECT COUNT(*) FROM {self._table}"
+            ).fetchone()
+            return count
@@ -6,6 +6,7 @@ from app.models import UserMetrics
 from app.services.game_engine import apply_task_submission
 
 DATA_DIR = Path(__file__).resolve().parent.parent / "data" / "users"
+ROADMAPS_DIR = Path(__file__).resolve().parent.parent / "data" / "roadmaps"
 
 
 def _user_file(user_id: str) -> Path:
@@ -50,34 +51,83 @@ def save_user_metrics(user_id: str, metrics: UserMetrics | dict) -> None:
     path.write_text(json.dumps(data, indent=2))
 
 
+def load_user_roadmap(user_id: str) -> dict | None:
+    path = ROADMAPS_DIR / f"{user_id}.json"
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def save_user_roadmap(user_id: str, role: str, weeks: list[dict]) -> None:
+    ROADMAPS_DIR.mkdir(parents=True, exist_ok=True)
+    path = ROADMAPS_DIR / f"{user_id}.json"
+    path.write_text(json.dumps({"role": role, "weeks": weeks}, indent=2))
+
+
+def _next_streak(metrics: UserMetrics, today: str) -> int:
+    if not metrics.last_submission_date:
+        return 1
+    last_date = date.fromisoformat(metrics.last_submission_date)
+    today_date = date.fromisoformat(today)
+    yesterday = today_date - timedelta(days=1)
+    if last_date == yesterday:
+        return metrics.streak + 1
+    if last_date == today_date:
+        return metrics.streak
+    return 1
+
+
 def update_metrics_on_task_submission(
     user_id: str,
     quality_score: int,
     assigned_increment: int = 1,
     completed_increment: int = 1,
 ) -> UserMetrics:
+    return update_metrics_on_task_submissions(
+        user_id,
+        [quality_score],
+        assigned_increment=assigned_increment,
+        completed_increment=completed_increment,
+    )
+
+
+def update_metrics_on_task_submissions(
+    user_id: str,
+    quality_scores: list[int],
+    assigned_increment: int = 1,
+    completed_increment: int = 1,
+) -> UserMetrics:
+    """Apply several submissions in order with a single load and save of the user file."""
     metrics = load_user_metrics(user_id)
     today = date.today().isoformat()
-    if not metrics.last_submission_date:
-        streak = 1
-    else:
-        last_date = date.fromisoformat(metrics.last_submission_date)
-        today_date = date.fromisoformat(today)
-        yesterday = today_date - timedelta(days=1)
-        if last_date == yesterday:
-            streak = metrics.streak + 1
-        elif last_date == today_date:
-            streak = metrics.streak
-        else:
-            streak = 1
-
-    metrics.last_submission_date = today
+    for quality_score in quality_scores:
+        streak = _next_streak(metrics, today)
+        metrics.last_submission_date = today
+        apply_task_submission(
+            metrics,
+            quality_score=quality_score,
+            streak=streak,
+            assigned_increment=assigned_increment,
+            completed_increment=completed_increment,
+        )
+    save_user_metrics(user_id, metrics)
+    return metrics
+
+
+def reconcile_task_submission(
+    user_id: str,
+    provisional_score: int,
+    final_score: int,
+) -> UserMetrics:
+    """Replace a provisionally graded submission's score with its final score."""
+    metrics = load_user_metrics(user_id)
     apply_task_submission(
         metrics,
-        quality_score=quality_score,
-        streak=streak,
-        assigned_increment=assigned_increment,
-        completed_increment=completed_increment,
+        quality_score=final_score,
+        streak=metrics.streak,
+        assigned_increment=0,
+        completed_increment=0,
+        previous_quality_score=provisional_score,
     )
     save_user_metrics(user_id, metrics)
     return metrics
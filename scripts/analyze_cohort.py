@@ -0,0 +1,87 @@
+"""
+Run gap analysis for a whole cohort against one role or all roles.
+
+Input is a CSV with `user_id` and `skills` columns (skills separated by ";")
+or a JSON list of {"user_id": ..., "user_skills": [...]} objects.
+
+Usage:
+    python -m scripts.analyze_cohort <input> [output_json] [--role ROLE] [--summary-only]
+
+Example:
+    python -m scripts.analyze_cohort data/cohort.csv cohort_report.json --role "Data Analyst"
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+
+from app.services.cohort_engine import DEFAULT_TOP_GAPS, analyze_cohort
+
+
+def load_cohort(path: Path) -> list[dict]:
+    if path.suffix.lower() == ".json":
+        with open(path) as f:
+            return json.load(f)
+
+    users = []
+    with open(path, newline="") as f:
+        for record in csv.DictReader(f):
+            skills = [s.strip() for s in (record.get("skills") or "").split(";")]
+            users.append(
+                {"user_id": record["user_id"], "user_skills": [s for s in skills if s]}
+            )
+    return users
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run cohort skill gap analysis.")
+    parser.add_argument("input", help="Path to cohort CSV or JSON file")
+    parser.add_argument("output_json", nargs="?", help="Write the report here instead of stdout")
+    parser.add_argument("--role", help="Analyze against this role only (default: all roles)")
+    parser.add_argument(
+        "--top-gaps",
+        type=int,
+        default=DEFAULT_TOP_GAPS,
+        help="Most common missing skills to report per role",
+    )
+    parser.add_argument(
+        "--summary-only",
+        action="store_true",
+        help="Only write per-role aggregates, not per-user results",
+    )
+    args = parser.parse_args()
+
+    users = load_cohort(Path(args.input))
+    started = time.perf_counter()
+    try:
+        report = analyze_cohort(
+            users,
+            selected_role=args.role,
+            include_users=not args.summary_only,
+            top_gaps=args.top_gaps,
+        )
+    except KeyError:
+        sys.exit(f"Unknown role: {args.role}")
+    elapsed = time.perf_counter() - started
+
+    if args.output_json:
+        with open(args.output_json, "w") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+    print(f"Analyzed {len(users)} users in {elapsed:.2f}s", file=sys.stderr)
+    for role in report["roles"]:
+        gaps = ", ".join(gap["skill"] for gap in role["common_gaps"][:3])
+        print(
+            f"  {role['role']}: mean alignment {role['alignment']['mean']}, top gaps: {gaps}",
+            file=sys.stderr,
+        )
+
+
+if __name__ == "__main__":
+    main()
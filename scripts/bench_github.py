@@ -0,0 +1,129 @@
+"""
+Benchmark GitHub repo listing against the local stand-in (scripts.fake_github).
+
+Scenarios, for one user with FAKE_GITHUB_REPOS repos:
+
+- legacy: the previous single synchronous request (first 30 repos only)
+- sequential: per_page=100, following pages one after another
+- concurrent, cold cache: first page, then the rest concurrently
+- revalidated: cache entries past max-age, every page answered 304
+- fresh: cache entries within max-age, no requests at all
+
+Reports wall time, repos returned and how much rate limit each one used.
+
+Usage:
+    python -m scripts.bench_github [--latency 0.1] [--repos 250]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import socket
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import requests
+import uvicorn
+
+from app.services.github_client import GITHUB_PER_PAGE, GitHubCache, GitHubClient
+from scripts import fake_github
+
+USERNAME = "octocat"
+
+
+def _start_server() -> tuple[uvicorn.Server, str]:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(fake_github.app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}"
+
+
+def _legacy_repos(base_url: str) -> list:
+    response = requests.get(
+        f"{base_url}/users/{USERNAME}/repos",
+        timeout=10,
+        headers={"Accept": "application/vnd.github+json"},
+    )
+    return response.json()
+
+
+async def _sequential_repos(client: GitHubClient) -> list:
+    path = f"/users/{USERNAME}/repos"
+    repos, page, last_page = [], 1, 1
+    while page <= last_page:
+        result = await client.get_page(path, {"per_page": GITHUB_PER_PAGE, "page": page})
+        repos.extend(result.body)
+        last_page = result.last_page if page == 1 else last_page
+        page += 1
+    return repos
+
+
+async def _concurrent_repos(client: GitHubClient) -> list:
+    repos, _ = await client.user_repos(USERNAME)
+    return repos
+
+
+async def run(base_url: str, cache_path: Path) -> list[tuple[str, float, int, dict]]:
+    results = []
+    cache = GitHubCache(cache_path)
+    client = GitHubClient(base_url=base_url, token=None, cache=cache)
+    admin = requests.Session()
+
+    async def scenario(label: str, fetch) -> None:
+        admin.post(f"{base_url}/_reset")
+        started = time.perf_counter()
+        repos = await fetch()
+        elapsed = time.perf_counter() - started
+        results.append((label, elapsed, len(repos), admin.get(f"{base_url}/_stats").json()))
+
+    await scenario("legacy single request", lambda: asyncio.to_thread(_legacy_repos, base_url))
+    cache.clear()
+    await scenario("sequential pages", lambda: _sequential_repos(client))
+    cache.clear()
+    fake_github.MAX_AGE = 0
+    await scenario("concurrent, cold cache", lambda: _concurrent_repos(client))
+    await scenario("concurrent, revalidated", lambda: _concurrent_repos(client))
+    fake_github.MAX_AGE = 60
+    cache.clear()
+    await client.user_repos(USERNAME)
+    await scenario("concurrent, fresh cache", lambda: _concurrent_repos(client))
+
+    await client.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark GitHub repo listing.")
+    parser.add_argument("--latency", type=float, default=0.1)
+    parser.add_argument("--repos", type=int, default=250)
+    args = parser.parse_args()
+
+    fake_github.LATENCY_SECONDS = args.latency
+    fake_github.REPOS_PER_USER = args.repos
+    fake_github.RATE_LIMIT = 10_000
+    server, base_url = _start_server()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            results = asyncio.run(run(base_url, Path(tmp) / "github_cache.sqlite3"))
+    finally:
+        server.should_exit = True
+
+    print(f"{'scenario':<28}{'ms':>9}{'repos':>8}{'requests':>10}{'304s':>7}{'rate limit used':>17}")
+    for label, elapsed, repo_count, stats in results:
+        print(
+            f"{label:<28}{elapsed * 1000:>9.1f}{repo_count:>8}{stats['requests']:>10}"
+            f"{stats['not_modified']:>7}{stats['rate_limit_used']:>17}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""
+Measure cold-start and warm-path LLM latency against the local Ollama stand-in.
+
+Compares:
+- the first evaluation after idle with and without the startup warm-up
+- warm-path evaluations with the static instructions sent as a reusable
+  system prompt versus the previous single-prompt layout, where the
+  per-request answer sits in the middle of the instructions
+
+Usage:
+    python -m scripts.bench_llm_warmup [--calls 20]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import socket
+import statistics
+import threading
+import time
+
+import httpx
+import uvicorn
+
+from app.services import llm_client
+from app.services.eval_engine import (
+    EVAL_MODEL,
+    EVAL_OPTIONS,
+    EVAL_SYSTEM_PROMPT,
+    _build_prompt,
+)
+from app.services.roadmap_engine import ROADMAP_MODEL, ROADMAP_SYSTEM_PROMPT
+from scripts import fake_ollama
+
+ANSWER = (
+    "Attempt {n}: I would put a load balancer in front of stateless API servers, keep sessions "
+    "in Redis, shard the primary database by user id and add read replicas. "
+    "Writes go through a queue so spikes are absorbed, and a CDN caches static "
+    "assets. It also covers monitoring, retries and rate limiting."
+)
+
+
+def _legacy_prompt(submission_text: str, task_context: str) -> str:
+    # Prompt layout used before the system-prompt split
+    header, json_format = EVAL_SYSTEM_PROMPT.split("JSON Format:\n")
+    return (
+        f"{header}Context: {task_context}. Answer: {submission_text}\n\n"
+        f"JSON Format:\n{json_format}"
+    )
+
+
+def _start_server() -> tuple[uvicorn.Server, str]:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(
+        uvicorn.Config(fake_ollama.app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}"
+
+
+async def _timed(coro) -> float:
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
+
+
+async def _evaluate(n: int, split: bool) -> None:
+    answer = ANSWER.format(n=n)
+    if split:
+        await llm_client.generate(
+            EVAL_MODEL,
+            _build_prompt(answer, "System Design"),
+            options=EVAL_OPTIONS,
+            use_cache=False,
+            system=EVAL_SYSTEM_PROMPT,
+        )
+    else:
+        await llm_client.generate(
+            EVAL_MODEL,
+            _legacy_prompt(answer, "System Design"),
+            options=EVAL_OPTIONS,
+            use_cache=False,
+        )
+
+
+async def run(calls: int, base_url: str) -> dict:
+    async with httpx.AsyncClient(base_url=base_url) as admin:
+        results = {}
+
+        await admin.post("/_reset")
+        results["cold first request"] = [await _timed(_evaluate(0, split=True))]
+
+        await admin.post("/_reset")
+        results["warm-up"] = [
+            await _timed(
+                llm_client.warm_up(
+                    [
+                        (EVAL_MODEL, EVAL_SYSTEM_PROMPT),
+                        (ROADMAP_MODEL, ROADMAP_SYSTEM_PROMPT),
+                    ]
+                )
+            )
+        ]
+        results["first request after warm-up"] = [await _timed(_evaluate(0, split=True))]
+
+        for split, label in ((False, "warm path, single prompt"), (True, "warm path, system prompt")):
+            await _evaluate(0, split)
+            results[label] = [await _timed(_evaluate(n, split)) for n in range(1, calls + 1)]
+
+        results["server stats"] = (await admin.get("/_stats")).json()
+        return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark LLM warm-up and prompt-prefix reuse.")
+    parser.add_argument("--calls", type=int, default=20)
+    args = parser.parse_args()
+
+    server, base_url = _start_server()
+    llm_client.OLLAMA_BASE_URL = base_url
+    try:
+        results = asyncio.run(run(args.calls, base_url))
+    finally:
+        server.should_exit = True
+
+    stats = results.pop("server stats")
+    print(f"{'scenario':<32}{'mean ms':>10}{'p50 ms':>10}")
+    for label, timings in results.items():
+        mean = statistics.mean(timings) * 1000
+        p50 = statistics.median(timings) * 1000
+        print(f"{label:<32}{mean:>10.1f}{p50:>10.1f}")
+    print(f"\nstand-in stats: {stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Measure per-request CPU time and allocations of analyze_role on the largest role.
+
+Compares the current analyze_role, which filters precomputed role profiles,
+against the previous implementation that rebuilt every missing-skill payload
+on each request (kept here as legacy_analyze_role).
+
+Usage:
+    python -m scripts.bench_role_analysis [--calls 20000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+import tracemalloc
+
+from app.services.market_data import market_data
+from app.services.role_engine import analyze_role
+from app.services.skill_curation import get_skill_curation
+
+
+def legacy_analyze_role(user_skills: list[str], selected_role: str) -> dict:
+    role_skills = market_data.current().data[selected_role]
+    user_skills_normalized = {s.lower().strip() for s in user_skills}
+
+    total_weight = 0
+    earned_weight = 0
+    missing_skills = []
+
+    for skill, frequency in role_skills.items():
+        importance_weight = round(frequency * 10)
+        total_weight += importance_weight
+
+        if skill.lower() in user_skills_normalized:
+            earned_weight += importance_weight
+        else:
+            percentage = round(frequency * 100, 2)
+            why_this_skill_matters = (
+                f"{skill} appears in {percentage}% of {selected_role} job postings "
+                f"and is critical for {selected_role}-level responsibilities."
+            )
+            market_signal = f"Mentioned in {percentage}% of {selected_role} postings."
+            curation = get_skill_curation(skill.lower().strip())
+            missing_skills.append(
+                {
+                    "skill": skill,
+                    "importance": importance_weight,
+                    "why_this_skill_matters": why_this_skill_matters,
+                    "market_signal": market_signal,
+                    "learning_resources": curation.get("learning_resources", []),
+                    "recommended_project": curation.get("recommended_project", {}),
+                    "checkpoints": curation.get("checkpoints", []),
+                }
+            )
+
+    alignment_score = (
+        round((earned_weight / total_weight) * 100, 2) if total_weight > 0 else 0.0
+    )
+    missing_skills.sort(key=lambda x: x["importance"], reverse=True)
+    return {"alignment_score": alignment_score, "missing_skills": missing_skills}
+
+
+def _cpu_per_call(fn, args: tuple, calls: int) -> float:
+    started = time.perf_counter()
+    for _ in range(calls):
+        fn(*args)
+    return (time.perf_counter() - started) / calls
+
+
+def _allocations_per_call(fn, args: tuple, calls: int) -> tuple[float, int]:
+    """Return (bytes allocated per call, peak bytes for a single call)."""
+    results = []
+    tracemalloc.start()
+    fn(*args)
+    _, single_peak = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    before, _ = tracemalloc.get_traced_memory()
+    # Keep results alive so every call's allocations stay counted
+    for _ in range(calls):
+        results.append(fn(*args))
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (after - before) / calls, single_peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark analyze_role on the largest role.")
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    data = market_data.current().data
+    role = max(data, key=lambda r: len(data[r]))
+    # A user holding a few of the role's skills: most skills come back missing
+    user_skills = list(data[role])[:3]
+    call_args = (user_skills, role)
+
+    legacy = legacy_analyze_role(*call_args)
+    current = analyze_role(*call_args)
+    assert legacy["missing_skills"] == current["missing_skills"]
+    assert legacy["alignment_score"] == current["alignment_score"]
+
+    print(f"Role: {role} ({len(data[role])} skills, {len(current['missing_skills'])} missing)")
+    for name, fn in (("legacy", legacy_analyze_role), ("precomputed", analyze_role)):
+        cpu = _cpu_per_call(fn, call_args, args.calls)
+        per_call, peak = _allocations_per_call(fn, call_args, min(args.calls, 2000))
+        print(
+            f"  {name:<12} {cpu * 1e6:8.2f} us/call  "
+            f"{per_call / 1024:7.2f} KiB retained/call  {peak / 1024:7.2f} KiB peak"
+        )
+
+
+if __name__ == "__main__":
+    main()
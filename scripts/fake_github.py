@@ -0,0 +1,147 @@
+"""
+Local GitHub REST API stand-in for benchmarks and manual testing.
+
+Implements GET /users/{username}/repos the way GitHub does, as far as the
+app's client cares:
+
+- page / per_page pagination (default 30, at most 100) with a Link header
+- a weak ETag per page; If-None-Match with a matching tag gets a 304
+- Cache-Control: max-age=FAKE_GITHUB_MAX_AGE
+- a primary rate limit of FAKE_GITHUB_RATE_LIMIT requests per
+  FAKE_GITHUB_RATE_WINDOW_SECONDS with X-RateLimit-* headers; 304s are free
+  and an exhausted limit answers 403
+
+Every user owns FAKE_GITHUB_REPOS repos, except users whose name starts
+with "missing", which do not exist. Each request costs
+FAKE_GITHUB_LATENCY_SECONDS.
+
+Usage:
+    python -m scripts.fake_github [--port 8765]
+    GITHUB_API_URL=http://127.0.0.1:8765 uvicorn app.main:app
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import os
+import time
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+
+REPOS_PER_USER = int(os.getenv("FAKE_GITHUB_REPOS", "250"))
+LATENCY_SECONDS = float(os.getenv("FAKE_GITHUB_LATENCY_SECONDS", "0.1"))
+MAX_AGE = int(os.getenv("FAKE_GITHUB_MAX_AGE", "60"))
+RATE_LIMIT = int(os.getenv("FAKE_GITHUB_RATE_LIMIT", "60"))
+RATE_WINDOW_SECONDS = int(os.getenv("FAKE_GITHUB_RATE_WINDOW_SECONDS", "3600"))
+DEFAULT_PER_PAGE = 30
+MAX_PER_PAGE = 100
+
+LANGUAGES = ["Python", "TypeScript", "JavaScript", "Go", "Rust", None, "Java", "Python"]
+
+app = FastAPI(title="fake-github")
+
+stats = {"requests": 0, "not_modified": 0, "rate_limited": 0}
+_window = {"started_at": time.time(), "used": 0}
+
+
+def _repos(username: str) -> list[dict]:
+    return [
+        {
+            "id": i + 1,
+            "name": f"project-{i:04d}",
+            "full_name": f"{username}/project-{i:04d}",
+            "fork": i % 7 == 0,
+            "language": LANGUAGES[i % len(LANGUAGES)],
+            "stargazers_count": (i * 37) % 101,
+        }
+        for i in range(REPOS_PER_USER)
+    ]
+
+
+def _rate_limit_headers() -> dict:
+    now = time.time()
+    if now - _window["started_at"] >= RATE_WINDOW_SECONDS:
+        _window["started_at"], _window["used"] = now, 0
+    return {
+        "X-RateLimit-Limit": str(RATE_LIMIT),
+        "X-RateLimit-Remaining": str(max(0, RATE_LIMIT - _window["used"])),
+        "X-RateLimit-Used": str(_window["used"]),
+        "X-RateLimit-Reset": str(math.ceil(_window["started_at"] + RATE_WINDOW_SECONDS)),
+    }
+
+
+def _link_header(request: Request, page: int, last_page: int, per_page: int) -> str | None:
+    if last_page <= 1:
+        return None
+    base = str(request.url.remove_query_params(["page", "per_page"]))
+    rels = []
+    if page < last_page:
+        rels += [("next", page + 1), ("last", last_page)]
+    if page > 1:
+        rels += [("first", 1), ("prev", page - 1)]
+    return ", ".join(f'<{base}?per_page={per_page}&page={n}>; rel="{rel}"' for rel, n in rels)
+
+
+@app.get("/users/{username}/repos")
+async def list_repos(username: str, request: Request, page: int = 1, per_page: int = DEFAULT_PER_PAGE):
+    stats["requests"] += 1
+    await asyncio.sleep(LATENCY_SECONDS)
+    headers = _rate_limit_headers()
+    if headers["X-RateLimit-Remaining"] == "0":
+        stats["rate_limited"] += 1
+        return JSONResponse(
+            {"message": "API rate limit exceeded"}, status_code=403, headers=headers
+        )
+
+    if username.startswith("missing"):
+        _window["used"] += 1
+        return JSONResponse({"message": "Not Found"}, status_code=404, headers=_rate_limit_headers())
+
+    per_page = max(1, min(per_page, MAX_PER_PAGE))
+    repos = _repos(username)
+    last_page = max(1, -(-len(repos) // per_page))
+    body = json.dumps(repos[(page - 1) * per_page : page * per_page]).encode("utf-8")
+    etag = f'W/"{hashlib.sha256(body).hexdigest()[:32]}"'
+    headers.update({"ETag": etag, "Cache-Control": f"public, max-age={MAX_AGE}"})
+    link = _link_header(request, page, last_page, per_page)
+    if link:
+        headers["Link"] = link
+
+    if request.headers.get("if-none-match") == etag:
+        stats["not_modified"] += 1
+        return Response(status_code=304, headers=headers)
+
+    _window["used"] += 1
+    headers.update(_rate_limit_headers())
+    return Response(body, media_type="application/json", headers=headers)
+
+
+@app.post("/_reset")
+def reset():
+    for key in stats:
+        stats[key] = 0
+    _window["started_at"], _window["used"] = time.time(), 0
+    return {"ok": True}
+
+
+@app.get("/_stats")
+def get_stats():
+    return {**stats, "rate_limit_used": _window["used"]}
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a local GitHub API stand-in.")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Local Ollama stand-in for benchmarks and manual testing.
+
+Implements the subset of the Ollama HTTP API the app uses (/api/generate,
+streaming and non-streaming, and /api/tags) with a simple latency model:
+
+- loading a model that is not resident costs FAKE_OLLAMA_LOAD_SECONDS, and a
+  model stays resident for the request's keep_alive
+- prompt evaluation costs FAKE_OLLAMA_PROMPT_SECONDS_PER_TOKEN for every token
+  after the longest prefix shared with one of the model's FAKE_OLLAMA_SLOTS
+  most recent inputs (the prefix reuse Ollama's per-slot KV cache gives)
+- generation costs FAKE_OLLAMA_GEN_SECONDS_PER_TOKEN per output token
+
+Responses are canned JSON shaped like the eval and roadmap engines expect.
+
+Usage:
+    python -m scripts.fake_ollama [--port 11434]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import time
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+
+LOAD_SECONDS = float(os.getenv("FAKE_OLLAMA_LOAD_SECONDS", "2.0"))
+PROMPT_SECONDS_PER_TOKEN = float(os.getenv("FAKE_OLLAMA_PROMPT_SECONDS_PER_TOKEN", "0.002"))
+GEN_SECONDS_PER_TOKEN = float(os.getenv("FAKE_OLLAMA_GEN_SECONDS_PER_TOKEN", "0.01"))
+SLOTS = int(os.getenv("FAKE_OLLAMA_SLOTS", "4"))
+DEFAULT_KEEP_ALIVE = 300.0
+CHARS_PER_TOKEN = 4
+STREAM_CHUNK_CHARS = 8
+
+FEEDBACK_RESPONSE = json.dumps(
+    {
+        "rating": 62,
+        "mistakes": ["Does not discuss failure modes"],
+        "correct_approach": "Describe the components, data flow and trade-offs.",
+        "improvements": ["Add capacity estimates", "Cover caching"],
+    }
+)
+
+app = FastAPI(title="fake-ollama")
+
+# model -> {"expires_at": float, "slots": [recent inputs, most recent last]}
+_models: dict[str, dict] = {}
+_load_locks: dict[str, asyncio.Lock] = {}
+stats = {"requests": 0, "loads": 0, "prompt_tokens": 0, "cached_tokens": 0}
+
+
+def _keep_alive_seconds(value) -> float:
+    if value is None:
+        return DEFAULT_KEEP_ALIVE
+    if isinstance(value, (int, float)):
+        return float("inf") if value < 0 else float(value)
+    match = re.fullmatch(r"(-?\d+(?:\.\d+)?)([smh]?)", str(value).strip())
+    if not match:
+        return DEFAULT_KEEP_ALIVE
+    amount = float(match.group(1))
+    if amount < 0:
+        return float("inf")
+    return amount * {"": 1, "s": 1, "m": 60, "h": 3600}[match.group(2)]
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+def _common_prefix(a: str, b: str) -> int:
+    limit = min(len(a), len(b))
+    i = 0
+    while i < limit and a[i] == b[i]:
+        i += 1
+    return i
+
+
+def _canned_response(full_input: str, skill: str) -> str:
+    if "7-day" in full_input:
+        return json.dumps(
+            [
+                {
+                    "day": day,
+                    "task": f"{skill} day {day}",
+                    "description": f"Practice {skill}, part {day}.",
+                }
+                for day in range(1, 8)
+            ]
+        )
+    return FEEDBACK_RESPONSE
+
+
+async def _evaluate_input(body: dict) -> str:
+    """Sleep for model load and prompt evaluation; return the response to generate."""
+    # "llama3" and "llama3:latest" are the same model
+    model = body.get("model", "").removesuffix(":latest")
+    system = body.get("system") or ""
+    prompt = body.get("prompt") or ""
+    full_input = system + "\n" + prompt
+    stats["requests"] += 1
+
+    keep_alive = _keep_alive_seconds(body.get("keep_alive"))
+    state = _models.get(model)
+    if state is None or state["expires_at"] < time.monotonic():
+        # Requests arriving mid-load wait for that load rather than starting another
+        async with _load_locks.setdefault(model, asyncio.Lock()):
+            state = _models.get(model)
+            if state is None or state["expires_at"] < time.monotonic():
+                stats["loads"] += 1
+                await asyncio.sleep(LOAD_SECONDS)
+                state = {"slots": [], "expires_at": time.monotonic() + keep_alive}
+                _models[model] = state
+
+    delay = 0.0
+    slots = state["slots"]
+    best = max(range(len(slots)), key=lambda i: _common_prefix(slots[i], full_input), default=None)
+    reused = _common_prefix(slots[best], full_input) if best is not None else 0
+    stats["prompt_tokens"] += _tokens(full_input)
+    stats["cached_tokens"] += _tokens(full_input[:reused])
+    delay += _tokens(full_input[reused:]) * PROMPT_SECONDS_PER_TOKEN
+    await asyncio.sleep(delay)
+
+    if best is not None and (reused or len(slots) >= SLOTS):
+        slots.pop(best)
+    slots.append(full_input)
+    del slots[:-SLOTS]
+    state["expires_at"] = time.monotonic() + keep_alive
+
+    skill_match = re.search(r"Skill: ([^\n]+)", full_input)
+    response = _canned_response(full_input, skill_match.group(1) if skill_match else "Skill")
+    num_predict = (body.get("options") or {}).get("num_predict")
+    if num_predict is not None and num_predict >= 0:
+        response = response[: num_predict * CHARS_PER_TOKEN]
+    return response
+
+
+@app.post("/api/generate")
+async def generate(request: Request):
+    body = await request.json()
+    response = await _evaluate_input(body)
+
+    if not body.get("stream", True):
+        await asyncio.sleep(_tokens(response) * GEN_SECONDS_PER_TOKEN)
+        return {"model": body.get("model"), "response": response, "done": True}
+
+    async def chunks():
+        for i in range(0, len(response), STREAM_CHUNK_CHARS):
+            await asyncio.sleep(_tokens(response[i : i + STREAM_CHUNK_CHARS]) * GEN_SECONDS_PER_TOKEN)
+            yield json.dumps({"response": response[i : i + STREAM_CHUNK_CHARS], "done": False}) + "\n"
+        yield json.dumps({"response": "", "done": True}) + "\n"
+
+    return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+
+@app.get("/api/tags")
+def tags():
+    return {
+        "models": [
+            {"name": "llama3:latest", "model": "llama3:latest", "digest": "fake-llama3"},
+        ]
+    }
+
+
+@app.post("/_reset")
+def reset():
+    _models.clear()
+    for key in stats:
+        stats[key] = 0
+    return {"ok": True}
+
+
+@app.get("/_stats")
+def get_stats():
+    return {**stats, "resident": sorted(_models)}
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Run a local Ollama stand-in.")
+    parser.add_argument("--port", type=int, default=11434)
+    args = parser.parse_args()
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
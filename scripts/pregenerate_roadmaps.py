@@ -0,0 +1,128 @@
+"""
+Pre-generate week plans for every (role, skill) pair in the market data.
+
+Plans are appended to the roadmap store (app/data/roadmap_store.jsonl) as
+they finish, so the run is resumable: pairs already in the store are skipped
+and a re-run after a market data refresh only generates the new pairs.
+
+Calls bypass the interactive circuit breaker and the LLM response cache: a
+slow batch must not trip the breaker, and the store already persists every
+plan. A failed pair is retried up to --retries times with exponential
+backoff. After that it is left out and retried on the next run.
+
+Usage:
+    python -m scripts.pregenerate_roadmaps [--concurrency 4] [--retries 2] [--prune]
+
+Example:
+    python -m scripts.pregenerate_roadmaps --market-data app/data/market_skills.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from app.services import llm_client
+from app.services.market_data import MARKET_DATA_PATH
+from app.services.roadmap_engine import AI_PLAN_ERRORS, request_ai_week_plan
+from app.services.roadmap_store import STORE_PATH, RoadmapStore
+
+RETRY_BASE_SECONDS = 2.0
+
+
+def load_pairs(market_data_path: Path) -> list[tuple[str, str]]:
+    with open(market_data_path) as f:
+        market_data = json.load(f)
+    return [
+        (role, skill)
+        for role, skills in market_data.items()
+        for skill in skills
+    ]
+
+
+async def pregenerate(
+    pairs: list[tuple[str, str]], store: RoadmapStore, concurrency: int, retries: int = 2
+) -> dict:
+    missing = [pair for pair in pairs if pair not in store]
+    print(f"{len(pairs)} pairs, {len(pairs) - len(missing)} already stored, {len(missing)} to generate")
+
+    semaphore = asyncio.Semaphore(concurrency)
+    counts = {"generated": 0, "failed": 0}
+
+    async def generate_pair(role: str, skill: str) -> None:
+        for attempt in range(retries + 1):
+            async with semaphore:
+                try:
+                    days = await request_ai_week_plan(
+                        skill, role, use_cache=False, use_breaker=False
+                    )
+                    break
+                except AI_PLAN_ERRORS as e:
+                    error = e
+            if attempt < retries:
+                # Back off outside the semaphore so other pairs keep going
+                await asyncio.sleep(RETRY_BASE_SECONDS * 2**attempt)
+        else:
+            counts["failed"] += 1
+            print(f"  failed {role} / {skill}: {type(error).__name__}")
+            return
+        store.put(role, skill, days)
+        counts["generated"] += 1
+        print(f"  [{counts['generated']}/{len(missing)}] {role} / {skill}")
+
+    try:
+        await asyncio.gather(*(generate_pair(role, skill) for role, skill in missing))
+    finally:
+        await llm_client.close_client()
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Pre-generate roadmap week plans for every (role, skill) pair."
+    )
+    parser.add_argument(
+        "--market-data", default=str(MARKET_DATA_PATH), help="Path to market skills JSON"
+    )
+    parser.add_argument("--store", default=str(STORE_PATH), help="Path to the roadmap store")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=llm_client.LLM_MAX_CONCURRENCY,
+        help="Number of plans generated at once",
+    )
+    parser.add_argument(
+        "--retries", type=int, default=2, help="Retries per pair before giving up"
+    )
+    parser.add_argument(
+        "--prune",
+        action="store_true",
+        help="Drop stored pairs that are no longer in the market data",
+    )
+    args = parser.parse_args()
+
+    # The shared LLM limiter would otherwise cap the run below --concurrency
+    llm_client.limiter.limit = max(llm_client.limiter.limit, args.concurrency)
+
+    pairs = load_pairs(Path(args.market_data))
+    store = RoadmapStore(Path(args.store))
+
+    started = time.perf_counter()
+    counts = asyncio.run(pregenerate(pairs, store, args.concurrency, args.retries))
+    elapsed = time.perf_counter() - started
+
+    if args.prune:
+        kept = store.compact(keep=set(pairs))
+        print(f"Compacted store to {kept} pairs")
+
+    print(
+        f"Generated {counts['generated']}, failed {counts['failed']} "
+        f"in {elapsed:.1f}s; store has {len(store)} pairs"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -2,19 +2,22 @@
 Process LinkedIn Job Postings dataset to extract skill demand frequency.
 
 Usage:
-    python scripts/process_linkedin_dataset.py <input_csv> [output_json]
+    python -m scripts.process_linkedin_dataset <input_csv> [--output OUTPUT_JSON]
 
 Example:
-    python scripts/process_linkedin_dataset.py data/jobs.csv
+    python -m scripts.process_linkedin_dataset data/jobs.csv
 """
 
 import argparse
 import json
+import os
 from collections import Counter
 from pathlib import Path
 
 import pandas as pd
 
+from app.services.skill_normalization import normalize_skill
+
 ROLE_MAPPINGS = {
     "Backend Developer": [
         "backend engineer",
@@ -52,19 +55,6 @@ ROLE_MAPPINGS = {
     ],
 }
 
-SKILL_NORMALIZATIONS = {
-    "python3": "python",
-    "js": "javascript",
-    "ts": "typescript",
-    "sql server": "sql",
-    "nosql": "mongodb",
-    "ml": "machine learning",
-    "ai": "artificial intelligence",
-    "devops": "devops",
-    "k8s": "kubernetes",
-    "gs": "google suite",
-}
-
 
 def normalize_job_title(job_title: str) -> str | None:
     if not job_title:
@@ -77,13 +67,6 @@ def normalize_job_title(job_title: str) -> str | None:
     return None
 
 
-def normalize_skill(skill: str) -> str | None:
-    if not skill:
-        return None
-    normalized = skill.lower().strip()
-    return SKILL_NORMALIZATIONS.get(normalized, normalized)
-
-
 def extract_skills_from_text(skills_text: str) -> list[str]:
     if not skills_text or not isinstance(skills_text, str):
         return []
@@ -163,8 +146,12 @@ def process_dataset(input_csv: str, output_json: str) -> None:
     output_path = Path(output_json)
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    with open(output_path, "w") as f:
+    # Write then rename so a running server's market data watcher never
+    # reads a half-written file
+    tmp_path = output_path.with_suffix(output_path.suffix + ".tmp")
+    with open(tmp_path, "w") as f:
         json.dump(output_data, f, indent=2)
+    os.replace(tmp_path, output_path)
 
     print(f"\nOutput saved to {output_json}")
 